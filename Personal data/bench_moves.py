@@ -0,0 +1,119 @@
+"""
+Micro-benchmark: the original multi-pass re.sub move cleaning vs the
+single-pass tokenizer in pgn_to_csv.py.
+
+Usage: python bench_moves.py [shanew012_games.pgn] [--repeat N]
+"""
+
+import argparse
+import platform
+import re
+import timeit
+
+from pgn_to_csv import compute_opening_ply, extract_opening_name, iter_pgn, tokenize_moves
+
+
+# -- original implementations (kept here only as the benchmark baseline) --
+
+
+def legacy_strip_comments(moves_text):
+    moves_text = re.sub(r"\{[^}]*\}", "", moves_text)
+    return re.sub(r"\s+", " ", moves_text).strip()
+
+
+def legacy_clean_moves(moves_text):
+    moves_text = re.sub(r"\s*(1-0|0-1|1/2-1/2|\*)\s*$", "", moves_text)
+    moves_text = re.sub(r"\d+\.{1,3}\s*", "", moves_text)
+    return moves_text.strip()
+
+
+def legacy_count_turns(moves_text):
+    if not moves_text:
+        return 0
+    return len(moves_text.split())
+
+
+def legacy_extract_opening_name(eco_url):
+    if not eco_url:
+        return ""
+    slug = eco_url.rstrip("/").split("/")[-1]
+    slug = re.sub(r"-\d+\..*$", "", slug)
+    slug = re.sub(r"-\d+\.\.\..+$", "", slug)
+    return slug.replace("-", " ").strip()
+
+
+def legacy_compute_opening_ply(eco_url, moves_text):
+    if not eco_url:
+        return ""
+    slug = eco_url.rstrip("/").split("/")[-1]
+    match = re.search(r"-(\d+\..*)$", slug)
+    if match:
+        ply = 0
+        for t in re.split(r"-", match.group(1)):
+            if re.sub(r"^\d+\.{1,3}", "", t).strip():
+                ply += 1
+        return ply
+    match2 = re.search(r"-(\d+)\.([A-Za-z])", slug)
+    if match2:
+        return int(match2.group(1)) * 2 - 1
+    return ""
+
+
+# -- pipelines under test --
+
+
+def legacy_pipeline(games):
+    out = []
+    for raw_moves, eco_url in games:
+        moves = legacy_clean_moves(legacy_strip_comments(raw_moves))
+        out.append(
+            (
+                moves,
+                legacy_count_turns(moves),
+                legacy_extract_opening_name(eco_url),
+                legacy_compute_opening_ply(eco_url, moves),
+            )
+        )
+    return out
+
+
+def tokenizer_pipeline(games):
+    out = []
+    for raw_moves, eco_url in games:
+        san_moves = tokenize_moves(raw_moves)
+        moves = " ".join(san_moves)
+        out.append(
+            (
+                moves,
+                len(san_moves),
+                extract_opening_name(eco_url),
+                compute_opening_ply(eco_url, moves),
+            )
+        )
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pgn", nargs="?", default="shanew012_games.pgn")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    games = [(g.get("Moves", ""), g.get("ECOUrl", "")) for g in iter_pgn(args.pgn)]
+    assert legacy_pipeline(games) == tokenizer_pipeline(games), "outputs differ"
+
+    results = {}
+    for name, fn in [("legacy", legacy_pipeline), ("tokenizer", tokenizer_pipeline)]:
+        best = min(timeit.repeat(lambda: fn(games), number=1, repeat=args.repeat))
+        results[name] = best
+        print(f"{name:>10}: {best * 1000:8.1f} ms  ({len(games) / best:,.0f} games/sec)")
+    print(f"   speedup: {results['legacy'] / results['tokenizer']:.2f}x over {len(games)} games")
+    # the ratio depends on the interpreter's re engine, so report it with the numbers
+    print(
+        f"     setup: {platform.python_implementation()} {platform.python_version()},"
+        f" best of {args.repeat}"
+    )
+
+
+if __name__ == "__main__":
+    main()
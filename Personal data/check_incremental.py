@@ -0,0 +1,71 @@
+"""
+Regression checks for pgn_to_csv --incremental resuming.
+
+1. A state file whose CSV was deleted is ignored: the rerun converts every
+   game again instead of resuming at the old offset.
+2. A PGN cut off mid-game (e.g. still being written) converts only its
+   complete games; once the rest arrives, the resumed run picks up the cut
+   game whole.
+
+Usage: python check_incremental.py [shanew012_games.pgn]
+"""
+
+import contextlib
+import csv
+import io
+import os
+import sys
+import tempfile
+
+from pgn_to_csv import pgn_to_csv_incremental
+
+
+def read_rows(csv_file):
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def convert(pgn_file, csv_file):
+    with contextlib.redirect_stdout(io.StringIO()):
+        pgn_to_csv_incremental(pgn_file, csv_file)
+    return read_rows(csv_file)
+
+
+def check_deleted_csv(pgn_bytes, tmp):
+    pgn_file = os.path.join(tmp, "games.pgn")
+    csv_file = os.path.join(tmp, "deleted.csv")
+    with open(pgn_file, "wb") as f:
+        f.write(pgn_bytes)
+    full = convert(pgn_file, csv_file)
+    os.remove(csv_file)
+    again = convert(pgn_file, csv_file)
+    assert len(again) == len(full) > 0, f"expected {len(full)} games, got {len(again)}"
+
+
+def check_truncated_pgn(pgn_bytes, tmp, cut=200_000):
+    pgn_file = os.path.join(tmp, "growing.pgn")
+    csv_file = os.path.join(tmp, "growing.csv")
+    with open(pgn_file, "wb") as f:
+        f.write(pgn_bytes[:cut])
+    partial = convert(pgn_file, csv_file)
+    assert all("[%clk" not in r["moves"] and r["game_id"] for r in partial), "cut-off game written"
+
+    with open(pgn_file, "wb") as f:
+        f.write(pgn_bytes)
+    rows = convert(pgn_file, csv_file)
+    expected = convert(pgn_file, os.path.join(tmp, "expected.csv"))
+    assert rows == expected, "resumed conversion differs from a full one"
+
+
+def main():
+    pgn = sys.argv[1] if len(sys.argv) > 1 else "shanew012_games.pgn"
+    with open(pgn, "rb") as f:
+        pgn_bytes = f.read()
+    with tempfile.TemporaryDirectory() as tmp:
+        check_deleted_csv(pgn_bytes, tmp)
+        check_truncated_pgn(pgn_bytes, tmp)
+    print("incremental conversion checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,272 +1,735 @@
-import csv
-import re
-from datetime import datetime, timezone
-
-
-def parse_pgn(pgn_file):
-    """Parse a PGN file and return a list of raw game dictionaries."""
-    games = []
-    current_headers = {}
-    moves_lines = []
-    in_moves = False
-
-    with open(pgn_file, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-
-            if not line:
-                if in_moves and moves_lines:
-                    moves_text = " ".join(moves_lines)
-                    # Strip clock annotations like {[%clk 0:03:01.9]}
-                    moves_text = re.sub(r"\{[^}]*\}", "", moves_text)
-                    # Collapse extra whitespace
-                    moves_text = re.sub(r"\s+", " ", moves_text).strip()
-                    current_headers["Moves"] = moves_text
-                    games.append(current_headers)
-                    current_headers = {}
-                    moves_lines = []
-                    in_moves = False
-                continue
-
-            header_match = re.match(r'^\[(\w+)\s+"(.*)"\]$', line)
-            if header_match:
-                current_headers[header_match.group(1)] = header_match.group(2)
-                in_moves = False
-            else:
-                in_moves = True
-                moves_lines.append(line)
-
-    # Handle last game if file doesn't end with a blank line
-    if current_headers:
-        if moves_lines:
-            moves_text = " ".join(moves_lines)
-            moves_text = re.sub(r"\{[^}]*\}", "", moves_text)
-            moves_text = re.sub(r"\s+", " ", moves_text).strip()
-            current_headers["Moves"] = moves_text
-        games.append(current_headers)
-
-    return games
-
-
-def datetime_to_epoch_ms(date_str, time_str):
-    """Convert 'YYYY.MM.DD' + 'HH:MM:SS' to epoch milliseconds (UTC)."""
-    try:
-        dt = datetime.strptime(f"{date_str} {time_str}", "%Y.%m.%d %H:%M:%S")
-        dt = dt.replace(tzinfo=timezone.utc)
-        return int(dt.timestamp() * 1000)
-    except (ValueError, TypeError):
-        return ""
-
-
-def extract_game_id(link):
-    """Extract the numeric game ID from the Chess.com link."""
-    if link:
-        # e.g. https://www.chess.com/game/live/136891385990
-        parts = link.rstrip("/").split("/")
-        return parts[-1] if parts else ""
-    return ""
-
-
-def clean_moves(moves_text):
-    """Remove move numbers and result token, leaving only SAN moves."""
-    # Remove result at the end (1-0, 0-1, 1/2-1/2, *)
-    moves_text = re.sub(r"\s*(1-0|0-1|1/2-1/2|\*)\s*$", "", moves_text)
-    # Remove move numbers like "1." or "14..."
-    moves_text = re.sub(r"\d+\.{1,3}\s*", "", moves_text)
-    return moves_text.strip()
-
-
-def count_turns(moves_text):
-    """Count the number of half-moves (plies) in the cleaned move string."""
-    if not moves_text:
-        return 0
-    return len(moves_text.split())
-
-
-def determine_victory_status(termination):
-    """Map Chess.com termination text to a victory_status category."""
-    t = termination.lower()
-    if "checkmate" in t or "mate" in t:
-        return "mate"
-    if "resign" in t:
-        return "resign"
-    if "time" in t and "drawn" not in t:
-        return "outoftime"
-    if "abandon" in t:
-        return "resign"
-    if "drawn" in t or "draw" in t:
-        # Sub-categorise draws
-        if "stalemate" in t:
-            return "draw"
-        if "insufficient" in t:
-            return "draw"
-        if "repetition" in t:
-            return "draw"
-        if "timeout" in t:
-            return "draw"
-        return "draw"
-    return "resign"
-
-
-def determine_winner(result, white, black, termination):
-    """Return 'white', 'black', or 'draw'."""
-    if result == "1-0":
-        return "white"
-    elif result == "0-1":
-        return "black"
-    else:
-        return "draw"
-
-
-def extract_opening_name(eco_url):
-    """
-    Derive a human-readable opening name from the ECOUrl.
-    e.g. '.../openings/Italian-Game-Knight-Attack-Normal-Variation-5.exd5'
-    becomes 'Italian Game: Knight Attack Normal Variation'
-    """
-    if not eco_url:
-        return ""
-    # Grab the last path segment
-    slug = eco_url.rstrip("/").split("/")[-1]
-    # Remove trailing move sequences like '-5.exd5' or '-2...dxe4-3.Nxe4-Nf6-4.Nxf6'
-    # These start with a dash followed by a digit+dot pattern
-    slug = re.sub(r"-\d+\..*$", "", slug)
-    # Also remove trailing '-1...e5' style patterns
-    slug = re.sub(r"-\d+\.\.\..+$", "", slug)
-    # Replace hyphens with spaces
-    name = slug.replace("-", " ")
-    # Insert ': ' after the first main opening name segment if it looks like a variation
-    # The ECOUrl typically has 'Opening-Name-Variation-Name'
-    return name.strip()
-
-
-def compute_opening_ply(eco_url, moves_text):
-    """
-    Estimate the opening ply from the ECOUrl.
-    Count the number of move segments in the URL tail (e.g. '2...dxe4-3.Nxe4-Nf6-4.Nxf6' = 5 ply).
-    If the URL has no move trail, estimate from the ECO code or default to a reasonable value.
-    """
-    if not eco_url:
-        return ""
-    slug = eco_url.rstrip("/").split("/")[-1]
-    # Find trailing moves after the opening name
-    # Pattern: a segment starting with a digit followed by a dot (e.g. '5.exd5')
-    match = re.search(r"-(\d+\..*)$", slug)
-    if match:
-        move_trail = match.group(1)
-        # Count individual SAN moves in the trail
-        # Split on '-' and count tokens that look like moves
-        tokens = re.split(r"-", move_trail)
-        ply = 0
-        for t in tokens:
-            # Remove move number prefixes like '3.' or '2...'
-            san = re.sub(r"^\d+\.{1,3}", "", t).strip()
-            if san:
-                ply += 1
-        return ply
-    # No moves in URL — estimate from the last move number in the slug
-    # e.g. 'Indian-Game-2.c3' -> look for a pattern like '2.c3' somewhere
-    match2 = re.search(r"-(\d+)\.([A-Za-z])", slug)
-    if match2:
-        # The move number * 2 - 1 gives approximate ply for a white move
-        move_num = int(match2.group(1))
-        return move_num * 2 - 1
-    # Default: count moves in the cleaned moves list up to a small number
-    # Just return empty if we can't determine
-    return ""
-
-
-def transform_game(raw):
-    """Transform a raw PGN game dict into the target CSV schema."""
-    # --- game_id ---
-    game_id = extract_game_id(raw.get("Link", ""))
-
-    # --- rated ---
-    # Chess.com "Live Chess" games are rated by default; no explicit tag in PGN.
-    # We can't know for certain, so we mark all as TRUE.
-    rated = "TRUE"
-
-    # --- start_time / end_time (epoch ms) ---
-    start_time = datetime_to_epoch_ms(raw.get("UTCDate", ""), raw.get("StartTime", ""))
-    end_time = datetime_to_epoch_ms(raw.get("EndDate", ""), raw.get("EndTime", ""))
-
-    # --- moves (clean SAN only) ---
-    raw_moves = raw.get("Moves", "")
-    moves = clean_moves(raw_moves)
-
-    # --- turns (number of half-moves / plies) ---
-    turns = count_turns(moves)
-
-    # --- victory_status ---
-    termination = raw.get("Termination", "")
-    victory_status = determine_victory_status(termination)
-
-    # --- winner ---
-    result = raw.get("Result", "")
-    winner = determine_winner(result, raw.get("White", ""), raw.get("Black", ""), termination)
-
-    # --- time_increment ---
-    time_increment = raw.get("TimeControl", "").replace("/", "+")
-
-    # --- players ---
-    white_id = raw.get("White", "")
-    white_rating = raw.get("WhiteElo", "")
-    black_id = raw.get("Black", "")
-    black_rating = raw.get("BlackElo", "")
-
-    # --- opening ---
-    opening_eco = raw.get("ECO", "")
-    eco_url = raw.get("ECOUrl", "")
-    opening_name = extract_opening_name(eco_url)
-    opening_ply = compute_opening_ply(eco_url, moves)
-
-    return {
-        "game_id": game_id,
-        "rated": rated,
-        "start_time": start_time,
-        "end_time": end_time,
-        "turns": turns,
-        "victory_status": victory_status,
-        "winner": winner,
-        "time_increment": time_increment,
-        "white_id": white_id,
-        "white_rating": white_rating,
-        "black_id": black_id,
-        "black_rating": black_rating,
-        "moves": moves,
-        "opening_eco": opening_eco,
-        "opening_name": opening_name,
-        "opening_ply": opening_ply,
-    }
-
-
-FIELDNAMES = [
-    "game_id", "rated", "start_time", "end_time", "turns",
-    "victory_status", "winner", "time_increment",
-    "white_id", "white_rating", "black_id", "black_rating",
-    "moves", "opening_eco", "opening_name", "opening_ply",
-]
-
-
-def pgn_to_csv(pgn_file, csv_file):
-    """Convert a PGN file to a CSV matching the target schema."""
-    raw_games = parse_pgn(pgn_file)
-
-    if not raw_games:
-        print("No games found in the PGN file.")
-        return
-
-    with open(csv_file, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
-        writer.writeheader()
-        for raw in raw_games:
-            row = transform_game(raw)
-            writer.writerow(row)
-
-    print(f"Successfully converted {len(raw_games)} games from '{pgn_file}' to '{csv_file}'.")
-
-
-if __name__ == "__main__":
-    pgn_path = "shanew012_games.pgn"
-    csv_path = "shanew012_games.csv"
-    pgn_to_csv(pgn_path, csv_path)
+import argparse
+import bz2
+import contextlib
+import csv
+import functools
+import gzip
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import re
+import time
+from datetime import datetime, timezone
+
+# compiled once at import; these run for every game in the file
+HEADER_RE = re.compile(r'^\[(\w+)\s+"(.*)"\]$')
+# one alternation covers the whole movetext: {comments}, move numbers ("14." /
+# "14..."), the trailing result token, and finally the SAN moves we keep
+MOVETEXT_TOKEN_RE = re.compile(
+    r"\{[^}]*\}|\d+\.{1,3}|(?:1-0|0-1|1/2-1/2|\*)\s*$|([^\s{]+)"
+)
+MOVE_NUMBER_RE = re.compile(r"\d+\.{1,3}")
+ECO_MOVE_TRAIL_RE = re.compile(r"-(\d+\..*)$")
+ECO_MOVE_NUMBER_RE = re.compile(r"-(\d+)\.([A-Za-z])")
+RESULT_TOKEN_RE = re.compile(r"(?:1-0|0-1|1/2-1/2|\*)$")
+
+
+def open_pgn(pgn_file):
+    """
+    Open a PGN source for text reading.
+    Accepts a path (plain, .bz2, .gz or .zst) or an already-open file object,
+    so compressed Lichess dumps can be streamed without unpacking them to disk.
+    """
+    if hasattr(pgn_file, "read"):
+        if isinstance(pgn_file, io.TextIOBase):
+            return pgn_file
+        return io.TextIOWrapper(pgn_file, encoding="utf-8")
+
+    path = str(pgn_file)
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rt", encoding="utf-8")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise ImportError(
+                "Reading .zst files requires the 'zstandard' package (pip install zstandard)."
+            ) from exc
+        raw = open(path, "rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def iter_pgn(pgn_file):
+    """
+    Yield raw game dictionaries one at a time from a PGN source.
+    Only the game currently being read is held in memory, so this works on
+    multi-gigabyte dumps. "Moves" holds the raw movetext; see tokenize_moves.
+    """
+    current_headers = {}
+    moves_lines = []
+    in_moves = False
+
+    opened_here = not hasattr(pgn_file, "read")
+    f = open_pgn(pgn_file)
+    try:
+        for line in f:
+            line = line.strip()
+
+            if not line:
+                if in_moves and moves_lines:
+                    current_headers["Moves"] = " ".join(moves_lines)
+                    yield current_headers
+                    current_headers = {}
+                    moves_lines = []
+                    in_moves = False
+                continue
+
+            header_match = HEADER_RE.match(line) if line[0] == "[" else None
+            if header_match:
+                current_headers[header_match.group(1)] = header_match.group(2)
+                in_moves = False
+            else:
+                in_moves = True
+                moves_lines.append(line)
+    finally:
+        if opened_here:
+            f.close()
+        elif f is not pgn_file:
+            f.detach()  # unwrap the caller's binary file without closing it
+
+    # Handle last game if file doesn't end with a blank line
+    if current_headers:
+        if moves_lines:
+            current_headers["Moves"] = " ".join(moves_lines)
+        yield current_headers
+
+
+def parse_pgn(pgn_file):
+    """
+    Parse a PGN file and return a list of raw game dictionaries. "Moves" is
+    the raw movetext, comments and clock annotations included; pass it
+    through clean_moves or tokenize_moves for the SAN moves.
+    """
+    return list(iter_pgn(pgn_file))
+
+
+def datetime_to_epoch_ms(date_str, time_str):
+    """Convert 'YYYY.MM.DD' + 'HH:MM:SS' to epoch milliseconds (UTC)."""
+    try:
+        dt = datetime.strptime(f"{date_str} {time_str}", "%Y.%m.%d %H:%M:%S")
+        dt = dt.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp() * 1000)
+    except (ValueError, TypeError):
+        return ""
+
+
+def extract_game_id(link):
+    """Extract the numeric game ID from the Chess.com link."""
+    if link:
+        # e.g. https://www.chess.com/game/live/136891385990
+        parts = link.rstrip("/").split("/")
+        return parts[-1] if parts else ""
+    return ""
+
+
+def tokenize_moves(moves_text):
+    """
+    Return the SAN moves of a raw movetext string as a list, in one pass.
+    Comments, move numbers and the result token are dropped; len() of the
+    result is the ply count.
+    """
+    return [t for t in MOVETEXT_TOKEN_RE.findall(moves_text) if t]
+
+
+def clean_moves(moves_text):
+    """Remove comments, move numbers and result token, leaving only SAN moves."""
+    return " ".join(tokenize_moves(moves_text))
+
+
+def determine_victory_status(termination):
+    """Map Chess.com termination text to a victory_status category."""
+    t = termination.lower()
+    if "checkmate" in t or "mate" in t:
+        return "mate"
+    if "resign" in t:
+        return "resign"
+    if "time" in t and "drawn" not in t:
+        return "outoftime"
+    if "abandon" in t:
+        return "resign"
+    if "drawn" in t or "draw" in t:
+        # Sub-categorise draws
+        if "stalemate" in t:
+            return "draw"
+        if "insufficient" in t:
+            return "draw"
+        if "repetition" in t:
+            return "draw"
+        if "timeout" in t:
+            return "draw"
+        return "draw"
+    return "resign"
+
+
+def determine_winner(result, white, black, termination):
+    """Return 'white', 'black', or 'draw'."""
+    if result == "1-0":
+        return "white"
+    elif result == "0-1":
+        return "black"
+    else:
+        return "draw"
+
+
+def extract_opening_name(eco_url):
+    """
+    Derive a human-readable opening name from the ECOUrl.
+    e.g. '.../openings/Italian-Game-Knight-Attack-Normal-Variation-5.exd5'
+    becomes 'Italian Game: Knight Attack Normal Variation'
+    """
+    if not eco_url:
+        return ""
+    # Grab the last path segment
+    slug = eco_url.rstrip("/").split("/")[-1]
+    # Remove trailing move sequences like '-5.exd5' or '-2...dxe4-3.Nxe4-Nf6-4.Nxf6'
+    # These start with a dash followed by a digit+dot pattern
+    slug = ECO_MOVE_TRAIL_RE.sub("", slug)
+    # Replace hyphens with spaces
+    name = slug.replace("-", " ")
+    # Insert ': ' after the first main opening name segment if it looks like a variation
+    # The ECOUrl typically has 'Opening-Name-Variation-Name'
+    return name.strip()
+
+
+def compute_opening_ply(eco_url, moves_text):
+    """
+    Estimate the opening ply from the ECOUrl.
+    Count the number of move segments in the URL tail (e.g. '2...dxe4-3.Nxe4-Nf6-4.Nxf6' = 5 ply).
+    If the URL has no move trail, estimate from the ECO code or default to a reasonable value.
+    """
+    if not eco_url:
+        return ""
+    slug = eco_url.rstrip("/").split("/")[-1]
+    # Find trailing moves after the opening name
+    # Pattern: a segment starting with a digit followed by a dot (e.g. '5.exd5')
+    match = ECO_MOVE_TRAIL_RE.search(slug)
+    if match:
+        move_trail = match.group(1)
+        # Count individual SAN moves in the trail
+        # Split on '-' and count tokens that look like moves
+        ply = 0
+        for t in move_trail.split("-"):
+            # Remove move number prefixes like '3.' or '2...'
+            number = MOVE_NUMBER_RE.match(t)
+            san = t[number.end():] if number else t
+            if san.strip():
+                ply += 1
+        return ply
+    # No moves in URL — estimate from the last move number in the slug
+    # e.g. 'Indian-Game-2.c3' -> look for a pattern like '2.c3' somewhere
+    match2 = ECO_MOVE_NUMBER_RE.search(slug)
+    if match2:
+        # The move number * 2 - 1 gives approximate ply for a white move
+        move_num = int(match2.group(1))
+        return move_num * 2 - 1
+    # Default: count moves in the cleaned moves list up to a small number
+    # Just return empty if we can't determine
+    return ""
+
+
+def transform_game(raw):
+    """Transform a raw PGN game dict into the target CSV schema."""
+    # --- game_id ---
+    game_id = extract_game_id(raw.get("Link", ""))
+
+    # --- rated ---
+    # Chess.com "Live Chess" games are rated by default; no explicit tag in PGN.
+    # We can't know for certain, so we mark all as TRUE.
+    rated = "TRUE"
+
+    # --- start_time / end_time (epoch ms) ---
+    start_time = datetime_to_epoch_ms(raw.get("UTCDate", ""), raw.get("StartTime", ""))
+    end_time = datetime_to_epoch_ms(raw.get("EndDate", ""), raw.get("EndTime", ""))
+
+    # --- moves (clean SAN only) and turns (number of half-moves / plies) ---
+    san_moves = tokenize_moves(raw.get("Moves", ""))
+    moves = " ".join(san_moves)
+    turns = len(san_moves)
+
+    # --- victory_status ---
+    termination = raw.get("Termination", "")
+    victory_status = determine_victory_status(termination)
+
+    # --- winner ---
+    result = raw.get("Result", "")
+    winner = determine_winner(result, raw.get("White", ""), raw.get("Black", ""), termination)
+
+    # --- time_increment ---
+    time_increment = raw.get("TimeControl", "").replace("/", "+")
+
+    # --- players ---
+    white_id = raw.get("White", "")
+    white_rating = raw.get("WhiteElo", "")
+    black_id = raw.get("Black", "")
+    black_rating = raw.get("BlackElo", "")
+
+    # --- opening ---
+    opening_eco = raw.get("ECO", "")
+    eco_url = raw.get("ECOUrl", "")
+    opening_name = extract_opening_name(eco_url)
+    opening_ply = compute_opening_ply(eco_url, moves)
+
+    return {
+        "game_id": game_id,
+        "rated": rated,
+        "start_time": start_time,
+        "end_time": end_time,
+        "turns": turns,
+        "victory_status": victory_status,
+        "winner": winner,
+        "time_increment": time_increment,
+        "white_id": white_id,
+        "white_rating": white_rating,
+        "black_id": black_id,
+        "black_rating": black_rating,
+        "moves": moves,
+        "opening_eco": opening_eco,
+        "opening_name": opening_name,
+        "opening_ply": opening_ply,
+    }
+
+
+FIELDNAMES = [
+    "game_id", "rated", "start_time", "end_time", "turns",
+    "victory_status", "winner", "time_increment",
+    "white_id", "white_rating", "black_id", "black_rating",
+    "moves", "opening_eco", "opening_name", "opening_ply",
+]
+
+
+# -- columnar (Parquet / Feather) output --
+
+# closed vocabularies, so every batch shares the same dictionary
+VICTORY_STATUSES = ["mate", "resign", "outoftime", "draw"]
+WINNERS = ["white", "black", "draw"]
+ECO_CODES = [f"{letter}{n:02d}" for letter in "ABCDE" for n in range(100)]
+COLUMNAR_FORMATS = {".parquet": "parquet", ".feather": "feather", ".arrow": "feather"}
+
+
+def output_format(out_file):
+    """Pick the output format from the file extension (csv unless .parquet/.feather/.arrow)."""
+    return COLUMNAR_FORMATS.get(os.path.splitext(str(out_file))[1].lower(), "csv")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError(
+            "Parquet/Feather output requires the 'pyarrow' package (pip install pyarrow)."
+        ) from exc
+    return pa, pq
+
+
+def arrow_schema():
+    """Typed schema for the games table: int16 ratings, int64 epoch ms, categorical codes."""
+    pa, _ = _import_pyarrow()
+    return pa.schema(
+        [
+            ("game_id", pa.string()),
+            ("rated", pa.bool_()),
+            ("start_time", pa.int64()),
+            ("end_time", pa.int64()),
+            ("turns", pa.int16()),
+            ("victory_status", pa.dictionary(pa.int8(), pa.string())),
+            ("winner", pa.dictionary(pa.int8(), pa.string())),
+            ("time_increment", pa.string()),
+            ("white_id", pa.string()),
+            ("white_rating", pa.int16()),
+            ("black_id", pa.string()),
+            ("black_rating", pa.int16()),
+            ("moves", pa.string()),
+            ("opening_eco", pa.dictionary(pa.int16(), pa.string())),
+            ("opening_name", pa.string()),
+            ("opening_ply", pa.int16()),
+        ]
+    )
+
+
+def _to_int(value):
+    """Integer column value; "" and placeholders such as "?" (unknown Elo) become null."""
+    if isinstance(value, int):
+        return value
+    value = value.strip()
+    return int(value) if value.isdigit() else None
+
+
+def _categorical(pa, values, vocabulary, index_type):
+    codes = {v: i for i, v in enumerate(vocabulary)}
+    return pa.DictionaryArray.from_arrays(
+        pa.array([codes.get(v) for v in values], type=index_type), pa.array(vocabulary)
+    )
+
+
+def _rows_to_table(rows):
+    """Build an Arrow table (arrow_schema) from transformed rows."""
+    pa, _ = _import_pyarrow()
+    schema = arrow_schema()
+
+    def column(name):
+        return [r[name] for r in rows]
+
+    arrays = {
+        "game_id": column("game_id"),
+        "rated": [r["rated"] == "TRUE" for r in rows],
+        "start_time": [_to_int(v) for v in column("start_time")],
+        "end_time": [_to_int(v) for v in column("end_time")],
+        "turns": [_to_int(v) for v in column("turns")],
+        "victory_status": _categorical(pa, column("victory_status"), VICTORY_STATUSES, pa.int8()),
+        "winner": _categorical(pa, column("winner"), WINNERS, pa.int8()),
+        "time_increment": column("time_increment"),
+        "white_id": column("white_id"),
+        "white_rating": [_to_int(v) for v in column("white_rating")],
+        "black_id": column("black_id"),
+        "black_rating": [_to_int(v) for v in column("black_rating")],
+        "moves": column("moves"),
+        "opening_eco": _categorical(pa, column("opening_eco"), ECO_CODES, pa.int16()),
+        "opening_name": column("opening_name"),
+        "opening_ply": [_to_int(v) for v in column("opening_ply")],
+    }
+    return pa.table(
+        [pa.array(arrays[f.name], type=f.type) for f in schema], schema=schema
+    )
+
+
+def _columnar_writer(out_file, fmt):
+    """Open a streaming Parquet or Arrow IPC (Feather v2) writer; both expose write_table/close."""
+    pa, pq = _import_pyarrow()
+    if fmt == "parquet":
+        return pq.ParquetWriter(out_file, arrow_schema())
+    return pa.ipc.new_file(out_file, arrow_schema())
+
+
+# -- parallel conversion --
+
+CHUNK_BYTES = 32 * 1024 * 1024
+BATCH_GAMES = 2000
+GAME_START = b"[Event "
+
+
+def find_chunks(pgn_file, n_chunks):
+    """
+    Split an uncompressed PGN file into (start, end) byte ranges that each
+    begin on a game boundary (an '[Event ' header line).
+    """
+    with open(pgn_file, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        starts = [0]
+        for i in range(1, n_chunks):
+            f.seek(max(size * i // n_chunks, starts[-1]))
+            f.readline()  # skip the (probably partial) line we landed in
+            pos = f.tell()
+            line = f.readline()
+            while line and not line.startswith(GAME_START):
+                pos = f.tell()
+                line = f.readline()
+            if not line:
+                break
+            if pos > starts[-1]:
+                starts.append(pos)
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def _rows_to_csv(rows):
+    """Render transformed rows as CSV text (no header)."""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=FIELDNAMES)
+    writer.writerows(rows)
+    return buf.getvalue()
+
+
+def _convert_chunk(task, render=_rows_to_csv):
+    """Worker: parse and transform one byte range of a PGN file."""
+    pgn_file, start, end = task
+    with open(pgn_file, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    rows = [transform_game(raw) for raw in iter_pgn(io.StringIO(text))]
+    return render(rows), len(rows)
+
+
+def _convert_batch(raw_games, render=_rows_to_csv):
+    """Worker: transform a batch of already-parsed games."""
+    return render([transform_game(raw) for raw in raw_games]), len(raw_games)
+
+
+def _batched(iterable, n):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == n:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _is_plain_file(pgn_file):
+    """True for an uncompressed PGN path, i.e. one we can seek around in by byte offset."""
+    return not hasattr(pgn_file, "read") and not str(pgn_file).endswith(
+        (".bz2", ".gz", ".zst")
+    )
+
+
+def _parts(pgn_file, workers, pool, render):
+    """
+    Yield (rendered_part, n_games) in the original game order, either from a
+    process pool or serially in batches of BATCH_GAMES.
+    """
+    if pool is None:
+        return (_convert_batch(b, render) for b in _batched(iter_pgn(pgn_file), BATCH_GAMES))
+    if _is_plain_file(pgn_file):
+        # split on game boundaries and let each worker parse its own byte range
+        n_chunks = max(workers * 4, os.path.getsize(pgn_file) // CHUNK_BYTES)
+        tasks = [(pgn_file, start, end) for start, end in find_chunks(pgn_file, n_chunks)]
+        return pool.imap(functools.partial(_convert_chunk, render=render), tasks)
+    # compressed streams can't be seeked, so parse here and fan out the transforms
+    return pool.imap(
+        functools.partial(_convert_batch, render=render),
+        _batched(iter_pgn(pgn_file), BATCH_GAMES),
+    )
+
+
+def pgn_to_csv(pgn_file, csv_file, workers=1, progress=None, quiet=False):
+    """
+    Convert a PGN file to a CSV matching the target schema.
+    Games are streamed from the parser straight into the writer, so memory use
+    stays flat regardless of the input size. With workers > 1 the games are
+    transformed in a process pool; output rows keep the original game order.
+    If csv_file ends in .parquet or .feather/.arrow, a typed columnar file is
+    written instead (needs pyarrow).
+    progress(n_games), if given, is called after each batch is written.
+    quiet=True suppresses the status lines, for callers embedding the converter.
+    """
+    fmt = output_format(csv_file)
+    t0 = time.perf_counter()
+    n_games = 0
+    with contextlib.ExitStack() as stack:
+        pool = stack.enter_context(multiprocessing.Pool(workers)) if workers > 1 else None
+        if fmt == "csv":
+            f = stack.enter_context(open(csv_file, "w", newline="", encoding="utf-8"))
+            csv.DictWriter(f, fieldnames=FIELDNAMES).writeheader()
+            render, write = _rows_to_csv, f.write
+        else:
+            writer = _columnar_writer(csv_file, fmt)
+            stack.callback(writer.close)
+            render, write = _rows_to_table, writer.write_table
+
+        for part, n in _parts(pgn_file, workers, pool, render):
+            write(part)
+            n_games += n
+            if progress is not None:
+                progress(n_games)
+    elapsed = time.perf_counter() - t0
+    if quiet:
+        return
+
+    if not n_games:
+        print("No games found in the PGN file.")
+        return
+
+    print(f"Successfully converted {n_games} games from '{pgn_file}' to '{csv_file}'.")
+    print(
+        f"{elapsed:.2f}s with {workers} worker(s): {n_games / max(elapsed, 1e-9):,.0f} games/sec"
+    )
+
+
+# -- incremental conversion --
+
+FINGERPRINT_BYTES = 64 * 1024
+
+
+def state_path(csv_file):
+    """Where the incremental state for an output CSV is kept."""
+    return f"{csv_file}.state.json"
+
+
+def fingerprint(pgn_file, offset):
+    """
+    Hash the first and last 64 KiB of a PGN file before `offset`.
+    Cheap check that an already-converted prefix hasn't been rewritten,
+    without reading the whole prefix again.
+    """
+    h = hashlib.sha256()
+    with open(pgn_file, "rb") as f:
+        h.update(f.read(min(offset, FINGERPRINT_BYTES)))
+        f.seek(max(0, offset - FINGERPRINT_BYTES))
+        h.update(f.read(offset - f.tell()))
+    return h.hexdigest()
+
+
+def read_game_ids(csv_file):
+    """Return the set of game_ids already present in a converted CSV."""
+    if not os.path.exists(csv_file):
+        return set()
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        return {row["game_id"] for row in csv.DictReader(f) if row.get("game_id")}
+
+
+def _load_state(csv_file):
+    """
+    The saved state, or {} if it is missing or no longer describes csv_file
+    (the CSV was deleted, replaced or edited since the state was written).
+    """
+    try:
+        with open(state_path(csv_file), encoding="utf-8") as f:
+            state = json.load(f)
+        if os.path.getsize(csv_file) != state.get("csv_size"):
+            return {}
+    except (OSError, ValueError):
+        return {}
+    return state
+
+
+def iter_pgn_offsets(source):
+    """
+    Yield (raw game, end offset) from a binary PGN file object, where the
+    offset is the byte position just after the game. A game is complete once
+    a blank line follows its movetext; a last game at EOF counts only if its
+    movetext ends in a result token. A game still being written is therefore
+    never yielded, and resuming from the last offset never starts mid-game.
+    """
+    pos = source.tell()
+    current_headers = {}
+    moves_lines = []
+    in_moves = False
+    for raw_line in source:
+        pos += len(raw_line)
+        line = raw_line.decode("utf-8").strip()
+
+        if not line:
+            if in_moves and moves_lines:
+                current_headers["Moves"] = " ".join(moves_lines)
+                yield current_headers, pos
+                current_headers = {}
+                moves_lines = []
+                in_moves = False
+            continue
+
+        header_match = HEADER_RE.match(line) if line[0] == "[" else None
+        if header_match:
+            current_headers[header_match.group(1)] = header_match.group(2)
+            in_moves = False
+        else:
+            in_moves = True
+            moves_lines.append(line)
+
+    if current_headers and moves_lines and RESULT_TOKEN_RE.search(moves_lines[-1]):
+        current_headers["Moves"] = " ".join(moves_lines)
+        yield current_headers, pos
+
+
+def pgn_to_csv_incremental(pgn_file, csv_file):
+    """
+    Append only the games that aren't in `csv_file` yet.
+    Games are skipped by game_id. For plain PGN files a state file records the
+    byte offset after the last complete game, a fingerprint of the file up to
+    there and the CSV's size; if the fingerprint and the CSV still match,
+    parsing resumes from that offset so the old part of the export is never
+    parsed again.
+    """
+    t0 = time.perf_counter()
+    seen = read_game_ids(csv_file)
+    plain = _is_plain_file(pgn_file)
+
+    start = 0
+    state = _load_state(csv_file) if seen else {}
+    if plain and state:
+        offset = state.get("offset", 0)
+        if offset <= os.path.getsize(pgn_file) and fingerprint(pgn_file, offset) == state.get(
+            "fingerprint"
+        ):
+            start = offset
+
+    new_file = not os.path.exists(csv_file) or os.path.getsize(csv_file) == 0
+    n_new = n_skipped = 0
+    with open(csv_file, "a", newline="", encoding="utf-8") as out:
+        writer = csv.DictWriter(out, fieldnames=FIELDNAMES)
+        if new_file:
+            writer.writeheader()
+
+        # plain files: track where the last complete game ends, so the next
+        # run resumes there (a game still being written is left for then)
+        end = start
+        if plain:
+            source = open(pgn_file, "rb")
+            source.seek(start)
+            games = iter_pgn_offsets(source)
+        else:
+            source = None
+            games = ((raw, None) for raw in iter_pgn(pgn_file))
+
+        try:
+            for raw, end_offset in games:
+                end = end_offset
+                game_id = extract_game_id(raw.get("Link", ""))
+                if game_id and game_id in seen:
+                    n_skipped += 1
+                    continue
+                if game_id:
+                    seen.add(game_id)
+                writer.writerow(transform_game(raw))
+                n_new += 1
+        finally:
+            if source is not None:
+                source.close()
+
+    if plain:
+        state = {
+            "offset": end,
+            "fingerprint": fingerprint(pgn_file, end),
+            "csv_size": os.path.getsize(csv_file),
+        }
+        with open(state_path(csv_file), "w", encoding="utf-8") as f:
+            json.dump(state, f)
+
+    elapsed = time.perf_counter() - t0
+    resumed = f" (resumed at byte {start:,})" if start else ""
+    print(
+        f"Appended {n_new} new games to '{csv_file}', skipped {n_skipped} already converted"
+        f"{resumed} in {elapsed:.2f}s."
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert a PGN export (plain, .bz2, .gz or .zst) to the games CSV schema."
+    )
+    parser.add_argument("pgn", nargs="?", default="shanew012_games.pgn", help="input PGN file")
+    parser.add_argument(
+        "csv",
+        nargs="?",
+        default="shanew012_games.csv",
+        help="output file (.csv, or .parquet / .feather for typed columnar output)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of worker processes (0 = one per CPU core)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="append only games not already in the output CSV (runs on one core)",
+    )
+    args = parser.parse_args(argv)
+    if args.incremental:
+        if output_format(args.csv) != "csv":
+            parser.error("--incremental only supports CSV output")
+        pgn_to_csv_incremental(args.pgn, args.csv)
+        return
+    workers = args.workers if args.workers > 0 else os.cpu_count() or 1
+    pgn_to_csv(args.pgn, args.csv, workers=workers)
+
+
+if __name__ == "__main__":
+    main()
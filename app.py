@@ -1,10 +1,28 @@
+import os
+
 import numpy as np
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
+from plotly.colors import sample_colorscale
 from plotly.subplots import make_subplots
 
+from lichess_insights import (
+    filters,
+    heatmap,
+    jobs,
+    openings,
+    personal,
+    ply,
+    profiling,
+    store,
+    tables,
+    tiers,
+    time_controls,
+    upsets,
+    users,
+)
+
 # -- page config --
 st.set_page_config(
     page_title="Lichess Insights Dashboard",
@@ -13,6 +31,20 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# -- opt-in render timing (?profile=1 or LICHESS_INSIGHTS_PROFILE=1) --
+# laps split the run into (section, phase) timings; "Profile a rerun" in the
+# sidebar also runs the next rerun under cProfile
+PROFILING = profiling.enabled(st.query_params)
+if PROFILING:
+    profiling.configure_logging()
+timer = profiling.SectionTimer(PROFILING)
+profiler = (
+    profiling.start_profile()
+    if PROFILING and st.session_state.pop("profile_next_run", False)
+    else None
+)
+timer.lap("Setup", "data")
+
 # light theme css
 st.markdown(
     """
@@ -283,14 +315,175 @@ st.markdown(
 
 @st.cache_data
 def load_data():
-    df_scatter = pd.read_csv("task1_scatter.csv")
-    df_tiers = pd.read_csv("task2_tiers.csv")
-    df_openings = pd.read_csv("task3_openings.csv")
-    df_upsets = pd.read_csv("task5_upsets.csv")
-    return df_scatter, df_tiers, df_openings, df_upsets
+    df_tiers = tables.read_table("task2_tiers")
+    df_openings = tables.read_table("task3_openings")
+    return df_tiers, df_openings
+
+
+@st.cache_resource
+def load_game_store():
+    """
+    Per-game tables (task1, task5) in narrow read-only columns, shared by every
+    session; memory-mapped from the .store/ cache, which is rebuilt if stale.
+    """
+    return store.load_store()[0]
+
+
+@st.cache_resource
+def load_heatmap_cube():
+    """Task 1 count cube, built once per process and shared read-only across sessions."""
+    df = load_game_store().scatter
+    return heatmap.build_cube(df["rating_diff"], df["turns"], df["victory_status"])
+
+
+@st.cache_resource
+def load_game_index():
+    """Sorted turns / |rating_diff| indexes and status bitmaps over the Task 1 games."""
+    df = load_game_store().scatter
+    return filters.build_index(df["turns"], df["rating_diff"], df["victory_status"])
+
+
+@st.cache_data(max_entries=8)
+def load_task_table(name):
+    """Read one extra task file on first use; sections only call this once opened."""
+    return tables.read_table(name)
+
+
+@st.cache_resource
+def load_rating_tiers():
+    """
+    Per-game average ratings sorted for runtime re-tiering, or None when the
+    game_ratings table (written by lichess_insights.aggregate) is not present.
+    """
+    if not tables.has_table("game_ratings"):
+        return None
+    df = tables.read_table("game_ratings")
+    return tiers.build_rating_tiers(df["avg_rating"], df["winner"], df["opening_ply"])
+
+
+@st.cache_data(max_entries=16)
+def ply_summary(boundaries):
+    """
+    Quartiles, whiskers and KDE of opening ply per tier: from the sorted game
+    ratings for custom boundaries, otherwise computed once from task4.
+    """
+    if boundaries is None:
+        return ply.ply_by_tier_summary(load_task_table("task4_ply_by_tier"))
+    return ply.ply_by_tier_from_ratings(load_rating_tiers(), boundaries)
+
+
+@st.cache_data(max_entries=16)
+def load_personal_overlay(username, digest):
+    """
+    Overlay frame for one player: from the on-disk user cache when registered
+    (digest is part of the key so a new upload is picked up), otherwise the
+    bundled export.
+    """
+    if digest is None:
+        return personal.load_personal(username=username)
+    return users.load(username)
+
+
+@st.cache_resource
+def conversion_jobs():
+    """One background conversion queue shared by every session."""
+    return jobs.JobQueue()
+
+
+@st.fragment(run_every=1.0)
+def conversion_progress(job_id):
+    """Poll a background conversion; swap the new player in once it finishes."""
+    job = conversion_jobs().get(job_id)
+    if job is None:
+        del st.session_state["pgn_job"]
+        return
+    if job.status == "done":
+        del st.session_state["pgn_job"]
+        st.session_state["pending_player"] = job.username
+        st.rerun()
+    elif job.status == "failed":
+        st.error(f"Conversion failed: {job.error}")
+        if st.button("Dismiss", key="dismiss_pgn_job"):
+            del st.session_state["pgn_job"]
+            st.rerun()
+    elif job.status == "queued":
+        st.progress(0.0, text="Waiting for a free worker...")
+    else:
+        eta = f" · about {job.eta:.0f}s left" if job.eta is not None else ""
+        st.progress(job.fraction, text=f"{job.games:,} of ~{job.total:,} games converted{eta}")
+
+
+def player_options():
+    """{username: digest} for every registered player, plus the bundled export (digest None)."""
+    options = users.read_registry()
+    if os.path.exists(personal.PERSONAL_GAMES):
+        options.setdefault(personal.USERNAME, None)
+    return options
+
+
+game_store = load_game_store()
+rating_tiers = load_rating_tiers()
+df_scatter, df_upsets = game_store.scatter, game_store.upsets
+df_tiers, df_openings = load_data()
+scatter_cube = load_heatmap_cube()
 
 
-df_scatter, df_tiers, df_openings, df_upsets = load_data()
+# -- cached derivations --
+# Each is keyed on the widget values it actually reads; the leading-underscore
+# data arguments are skipped by the cache hash because they are fixed per
+# process. max_entries bounds each cache (least recently used entries go first).
+
+
+@st.cache_data(max_entries=32)
+def task1_view(_cube, statuses, turn_range, rating_diff_range, nbx, nby):
+    return heatmap.view(_cube, statuses, turn_range, rating_diff_range, nbx, nby)
+
+
+@st.cache_data(max_entries=16)
+def task1_sample(_index, _scatter, statuses, turn_range, rating_diff_range, n_points):
+    """A random sample of at most n_points matching games (real rows, with game ids)."""
+    rows = filters.select_rows(_index, statuses, turn_range, rating_diff_range)
+    sample = _scatter.iloc[filters.sample_rows(rows, n_points)]
+    return sample.assign(game_id=sample["game_id"].str.decode("ascii")), len(rows)
+
+
+@st.cache_data(max_entries=1)
+def tier_tables(_df_tiers, boundaries):
+    """Task 2 rows from task2_tiers, or re-tiered from the sorted game ratings (boundaries)."""
+    if boundaries is None:
+        table = tiers.tier_table(_df_tiers)
+    else:
+        table = tiers.tier_table(
+            tiers.tier_counts(load_rating_tiers(), boundaries), tiers.tier_labels(boundaries)
+        )
+    return tiers.tier_rows(table), tiers.tier_advantages(table)
+
+
+@st.cache_resource
+def load_opening_table():
+    """
+    Per-opening W/B/D stats sorted by popularity, built once: every opening when
+    the opening_outcomes table (lichess_insights.aggregate) is present, else
+    task3's top 15.
+    """
+    stem = "opening_outcomes" if tables.has_table("opening_outcomes") else "task3_openings"
+    return openings.opening_stats(tables.read_table(stem))
+
+
+@st.cache_data(max_entries=64)
+def top_openings(_df_ops, top_n, min_games, name_contains):
+    return openings.top_openings(_df_ops, top_n, min_games, name_contains)
+
+
+@st.cache_data(max_entries=64)
+def upset_bins(_df_upsets, gap_bin_size, max_gap_display):
+    return upsets.upset_rate_by_bin(_df_upsets, gap_bin_size, max_gap_display)
+
+
+@st.cache_data(max_entries=1)
+def upset_summary(_df_upsets):
+    return upsets.upset_summary(_df_upsets)
+
 
 # -- shared plotly layout for the light theme --
 PLOTLY_LAYOUT = dict(
@@ -338,6 +531,31 @@ VICTORY_COLORS = {
     "draw": "#a78bfa",
 }
 
+# upper end of the Task 3 slider (the chart gets one row per opening)
+MAX_OPENINGS_SHOWN = 100
+
+# gold diamonds mark the user's own games on every chart
+MY_MARKER = dict(
+    symbol="diamond",
+    size=9,
+    color="#eab308",
+    line=dict(color="#ffffff", width=1),
+)
+
+STATUS_LABELS = {
+    "mate": "Checkmate",
+    "resign": "Resignation",
+    "outoftime": "Out of Time",
+    "draw": "Draw",
+}
+
+
+def show_chart(fig, section):
+    """st.plotly_chart, timed as the section's serialize phase (figure -> JSON -> browser)."""
+    timer.lap(section, "serialize")
+    st.plotly_chart(fig, use_container_width=True)
+
+
 # -- header --
 st.markdown('<div class="hero-title">♟️ Lichess Insights</div>', unsafe_allow_html=True)
 st.markdown(
@@ -345,20 +563,10 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# -- top-level stats (kept for use in insight boxes, but no KPI cards shown) --
-total_games = len(df_scatter)
-avg_turns = df_scatter["turns"].mean()
-avg_rating_diff = df_scatter["rating_diff"].abs().mean()
-mate_pct = len(df_scatter[df_scatter["victory_status"] == "mate"]) / total_games * 100
-resign_pct = (
-    len(df_scatter[df_scatter["victory_status"] == "resign"]) / total_games * 100
-)
-white_wins_total = df_tiers[df_tiers["winner"] == "white"]["game_count"].sum()
-black_wins_total = df_tiers[df_tiers["winner"] == "black"]["game_count"].sum()
-draw_total = df_tiers[df_tiers["winner"] == "draw"]["game_count"].sum()
-white_adv = white_wins_total / (white_wins_total + black_wins_total + draw_total) * 100
+df_ops = load_opening_table()
 
 # -- sidebar filters --
+timer.lap("Sidebar", "widgets")
 with st.sidebar:
     st.markdown("## ♟️ Dashboard Controls")
     st.markdown("---")
@@ -366,12 +574,12 @@ with st.sidebar:
     st.markdown("### 🎯 Task 1 Filters")
     status_filter = st.multiselect(
         "Victory Status",
-        options=sorted(df_scatter["victory_status"].unique()),
-        default=sorted(df_scatter["victory_status"].unique()),
+        options=list(scatter_cube.statuses),
+        default=list(scatter_cube.statuses),
         help="Filter game outcomes in the scatterplot",
     )
 
-    max_turns_limit = int(df_scatter["turns"].max())
+    max_turns_limit = int(scatter_cube.turns[-1])
     turn_range = st.slider(
         "Turn Range",
         min_value=1,
@@ -380,7 +588,7 @@ with st.sidebar:
         help="Filter games by number of turns",
     )
 
-    rating_diff_abs_max = int(df_scatter["rating_diff"].abs().max())
+    rating_diff_abs_max = int(np.abs(scatter_cube.rating_diffs[[0, -1]]).max())
     rating_diff_range = st.slider(
         "Absolute Rating Difference",
         min_value=0,
@@ -391,20 +599,67 @@ with st.sidebar:
 
     heatmap_view = st.radio(
         "Heatmap View",
-        ["Combined", "Split by Outcome"],
+        ["Combined", "Split by Outcome", "Sampled Scatter"],
         index=0,
-        help="Show a single combined heatmap or separate heatmaps per game-end reason. In split mode, hovering over any cell shows counts for all outcome types at that location.",
+        help="Show a single combined heatmap, separate heatmaps per game-end reason, or a scatter of a random sample of the matching games. In split mode, hovering over any cell shows counts for all outcome types at that location.",
+    )
+
+    payload_budget = st.select_slider(
+        "Chart Payload Budget",
+        options=[2_000, 5_000, 10_000, 20_000, 50_000],
+        value=10_000,
+        format_func=lambda n: f"{n:,}",
+        help="Maximum number of heatmap cells or scatter points sent to the browser for the Task 1 chart. Everything is binned or sampled server-side, so page weight stays the same however many games are loaded.",
     )
 
+    st.markdown("---")
+    st.markdown("### ⚖️ Tier Options")
+    boundary_text = st.text_input(
+        "Rating Tier Boundaries",
+        value=", ".join(map(str, tiers.DEFAULT_BOUNDARIES)),
+        disabled=rating_tiers is None,
+        help="Average-rating cut points between skill tiers, used by Task 2 and the opening-depth view. "
+        + (
+            "Tiers are recomputed from every game's average rating in milliseconds."
+            if rating_tiers is not None
+            else "Needs the game_ratings table: run python -m lichess_insights.aggregate chess.csv."
+        ),
+    )
+    try:
+        tier_boundaries = tiers.parse_boundaries(boundary_text)
+    except ValueError as exc:
+        st.error(str(exc))
+        tier_boundaries = tiers.DEFAULT_BOUNDARIES
+    # None = use the precomputed SQL tiers (task2/task4)
+    retier = tier_boundaries if rating_tiers is not None else None
+
     st.markdown("---")
     st.markdown("### 🫧 Task 3 Options")
-    top_n_openings = st.slider(
-        "Top N Most-Played Openings",
-        min_value=5,
-        max_value=15,
-        value=12,
-        help="Select the N most frequently played openings in the dataset. They are then ranked by White win rate on the chart.",
+    max_openings = min(len(df_ops), MAX_OPENINGS_SHOWN)
+    if max_openings > 1:
+        # a slider needs min_value < max_value; small opening tables shrink its range
+        top_n_openings = st.slider(
+            "Top N Most-Played Openings",
+            min_value=min(5, max_openings - 1),
+            max_value=max_openings,
+            value=min(12, max_openings),
+            help="Select the N most frequently played openings in the dataset. They are then ranked by White win rate on the chart.",
+        )
+    else:
+        top_n_openings = max_openings
+    min_opening_games = st.number_input(
+        "Minimum Games per Opening",
+        min_value=0,
+        value=0,
+        step=25,
+        help="Leave out openings played fewer times than this.",
     )
+    opening_search = st.text_input(
+        "Opening Name Contains",
+        placeholder="e.g. Sicilian",
+        help="Only show openings whose name contains this text (case-insensitive).",
+    ).strip()
+    st.caption(f"{len(df_ops):,} openings available.")
 
     st.markdown("---")
     st.markdown("### 🏆 Task 5 Options")
@@ -425,6 +680,61 @@ with st.sidebar:
         help="Limit the x-axis range",
     )
 
+    st.markdown("---")
+    st.markdown("### 👤 Personal Data")
+    with st.expander("Add a Player"):
+        pgn_upload = st.file_uploader("PGN export", type=["pgn"], key="pgn_upload")
+        upload_username = st.text_input(
+            "Username",
+            key="upload_username",
+            help="Leave blank to use the player who appears in the most games.",
+        )
+        if pgn_upload is not None and st.button(
+            "Convert Games", key="convert_pgn", disabled="pgn_job" in st.session_state
+        ):
+            try:
+                job = conversion_jobs().submit(
+                    pgn_upload.getvalue(), upload_username.strip() or None
+                )
+            except jobs.QueueFull as exc:
+                st.warning(str(exc))
+            else:
+                st.session_state["pgn_job"] = job.id
+    if "pgn_job" in st.session_state:
+        conversion_progress(st.session_state["pgn_job"])
+
+    # a finished conversion selects its player (set before the selectbox exists)
+    if "pending_player" in st.session_state:
+        st.session_state["player"] = st.session_state.pop("pending_player")
+    players = player_options()
+    player = st.selectbox(
+        "Player",
+        sorted(players),
+        key="player",
+        disabled=not players,
+        help="Players whose PGN exports have been converted on this server.",
+    )
+    df_personal = load_personal_overlay(player, players[player]) if player else None
+    show_personal = st.toggle(
+        "Overlay My Games",
+        value=False,
+        disabled=df_personal is None,
+        help="Show the selected player's games (gold ⭐ diamonds) on top of the database charts.",
+    )
+    show_personal = show_personal and df_personal is not None
+
+    st.markdown("---")
+    with st.expander("🧮 Memory Footprint"):
+        mem = store.footprint(game_store)
+        st.dataframe(mem, hide_index=True, use_container_width=True)
+        st.caption(
+            f"Shared game store: {mem['bytes'].sum() / 1024:,.0f} KiB, "
+            f"{'memory-mapped from .store/' if mem['mapped'].all() else 'held in memory'}. "
+            f"Process RSS: {store.process_rss() / 1024**2:,.0f} MiB."
+        )
+    # filled in at the end of the run, once every section has been timed
+    timing_slot = st.empty() if PROFILING else None
+
     st.markdown("---")
     st.markdown(
         """
@@ -439,6 +749,7 @@ with st.sidebar:
 # -----------------------------------------------
 # Task 1: Scatterplot - rating diff vs game length
 # -----------------------------------------------
+timer.lap("Task 1", "data")
 st.markdown(
     '<div class="section-header"><span class="num">01</span> Setting the Scene: Skill Gap &amp; Game Length</div>',
     unsafe_allow_html=True,
@@ -448,22 +759,98 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# apply sidebar filters
-filtered_scatter = df_scatter[
-    (df_scatter["victory_status"].isin(status_filter))
-    & (df_scatter["turns"] >= turn_range[0])
-    & (df_scatter["turns"] <= turn_range[1])
-    & (df_scatter["rating_diff"].abs() >= rating_diff_range[0])
-    & (df_scatter["rating_diff"].abs() <= rating_diff_range[1])
-]
+# apply sidebar filters (slices of the precomputed count cube); grid resolution
+# is capped so the cells across all panels fit in the payload budget
+if heatmap_view == "Split by Outcome":
+    nbx, nby = heatmap.grid_shape(payload_budget, (60, 50), len(status_filter))
+else:
+    nbx, nby = heatmap.grid_shape(payload_budget, (100, 80))
+t1_view = task1_view(
+    scatter_cube, tuple(status_filter), turn_range, rating_diff_range, nbx, nby
+)
+
+# the user's decisive games under the same filters (the database table has no draws)
+if show_personal:
+    my_t1 = personal.filter_games(df_personal, status_filter, turn_range, rating_diff_range)
+
+
+def my_games_trace(games, **kwargs):
+    """Gold-diamond scatter of the user's games at (rating_diff, turns)."""
+    return go.Scatter(
+        x=games["rating_diff"],
+        y=games["turns"],
+        mode="markers",
+        marker=MY_MARKER,
+        name="⭐ My Games",
+        customdata=games["result"],
+        hovertemplate="<b>My game</b><br>Rating Diff: %{x}<br>Turns: %{y}<br>Result: %{customdata}<extra></extra>",
+        **kwargs,
+    )
+
+
+if heatmap_view != "Split by Outcome" and t1_view["bins"] is None:
+    st.info("No games match the current filters.")
+
+elif heatmap_view == "Sampled Scatter":
+    # ---- decimated scatter: at most payload_budget points ----
+    t1_sample, t1_matching = task1_sample(
+        load_game_index(),
+        df_scatter,
+        tuple(status_filter),
+        turn_range,
+        rating_diff_range,
+        payload_budget,
+    )
+    timer.lap("Task 1", "figure")
+    fig1 = go.Figure()
+    for s in ["draw", "mate", "resign", "outoftime"]:
+        pts = t1_sample[t1_sample["victory_status"] == s]
+        if pts.empty:
+            continue
+        fig1.add_trace(
+            go.Scattergl(
+                x=pts["rating_diff"],
+                y=pts["turns"],
+                mode="markers",
+                name=STATUS_LABELS.get(s, s.capitalize()),
+                marker=dict(
+                    color=VICTORY_COLORS.get(s, COLORS["primary"]),
+                    size=4,
+                    opacity=0.45,
+                ),
+                customdata=pts["game_id"],
+                hovertemplate="Game %{customdata}<br>Rating Diff: %{x}<br>Turns: %{y}<extra>%{fullData.name}</extra>",
+            )
+        )
+    fig1.update_layout(**PLOTLY_LAYOUT)
+    fig1.update_layout(
+        title="Game Length vs. Skill Gap: A Random Sample of Games",
+        xaxis=dict(
+            title="Rating Differential (White − Black)",
+            gridcolor="rgba(0,0,0,0.04)",
+            zeroline=True,
+            zerolinecolor="rgba(0,0,0,0.12)",
+            zerolinewidth=1,
+        ),
+        yaxis=dict(title="Number of Turns", gridcolor="rgba(0,0,0,0.04)"),
+        height=520,
+        legend=dict(orientation="h", yanchor="bottom", y=1.05, xanchor="center", x=0.5),
+    )
+    if show_personal:
+        fig1.add_trace(my_games_trace(my_t1))
+    show_chart(fig1, "Task 1")
+    st.caption(f"Showing {len(t1_sample):,} of {t1_matching:,} matching games.")
 
-if heatmap_view == "Combined":
+elif heatmap_view == "Combined":
     # ---- single combined heatmap (original view) ----
+    combined_grids, x_centers, y_centers = t1_view["bins"]
+    timer.lap("Task 1", "figure")
     fig1 = go.Figure()
     fig1.add_trace(
-        go.Histogram2d(
-            x=filtered_scatter["rating_diff"],
-            y=filtered_scatter["turns"],
+        go.Heatmap(
+            z=sum(combined_grids.values()),
+            x=x_centers,
+            y=y_centers,
             colorscale=[
                 [0, "rgba(255,255,255,0)"],
                 [0.05, "#eef2ff"],
@@ -474,15 +861,13 @@ if heatmap_view == "Combined":
                 [0.9, "#3730a3"],
                 [1, "#1e1b4b"],
             ],
-            nbinsx=100,
-            nbinsy=80,
             colorbar=dict(
                 title=dict(text="Games", font=dict(size=11, color="#64748b")),
                 tickfont=dict(color="#64748b"),
                 thickness=12,
                 len=0.6,
             ),
-            hovertemplate="Rating Diff: %{x}<br>Turns: %{y}<br>Count: %{z}<extra></extra>",
+            hovertemplate="Rating Diff: %{x:.0f}<br>Turns: %{y:.0f}<br>Count: %{z:.0f}<extra></extra>",
         )
     )
 
@@ -512,7 +897,12 @@ if heatmap_view == "Combined":
         annotation_position="top",
         annotation_font=dict(size=10, color="#4f46e5"),
     )
-    st.plotly_chart(fig1, use_container_width=True)
+    if show_personal:
+        fig1.add_trace(my_games_trace(my_t1))
+        fig1.update_layout(
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+    show_chart(fig1, "Task 1")
 
 else:
     # ---- split heatmaps by victory_status with cross-panel tooltips ----
@@ -559,50 +949,29 @@ else:
         ],
     }
 
-    _SPLIT_STATUS_LABELS = {
-        "mate": "Checkmate",
-        "resign": "Resignation",
-        "outoftime": "Out of Time",
-        "draw": "Draw",
-    }
-
     _SPLIT_STATUS_ORDER = ["draw", "mate", "resign", "outoftime"]
     active_statuses = [
-        s
-        for s in _SPLIT_STATUS_ORDER
-        if s in filtered_scatter["victory_status"].unique()
+        s for s in _SPLIT_STATUS_ORDER if t1_view["totals"].get(s, 0) > 0
     ]
 
     if len(active_statuses) == 0:
         st.info("No games match the current filters.")
     else:
-        # --- pre-compute shared 2-D bins across all statuses ---
-        x_vals = filtered_scatter["rating_diff"].values
-        y_vals = filtered_scatter["turns"].values
-        nbx, nby = 60, 50
-        x_edges = np.linspace(x_vals.min(), x_vals.max(), nbx + 1)
-        y_edges = np.linspace(y_vals.min(), y_vals.max(), nby + 1)
-        x_centers = (x_edges[:-1] + x_edges[1:]) / 2
-        y_centers = (y_edges[:-1] + y_edges[1:]) / 2
-
-        status_grids: dict[str, np.ndarray] = {}
-        for s in active_statuses:
-            mask = (filtered_scatter["victory_status"] == s).values
-            H, _, _ = np.histogram2d(
-                x_vals[mask], y_vals[mask], bins=[x_edges, y_edges]
-            )
-            status_grids[s] = H.T  # shape (nby, nbx)
+        # --- shared 2-D bins across all statuses, re-binned from the cube ---
+        # each grid has shape (nby, nbx)
+        status_grids, x_centers, y_centers = t1_view["bins"]
 
         # --- subplot grid: single row, all panels side by side ---
         n = len(active_statuses)
         ncols = n
         nrows = 1
 
+        timer.lap("Task 1", "figure")
         fig1 = make_subplots(
             rows=1,
             cols=ncols,
             subplot_titles=[
-                _SPLIT_STATUS_LABELS.get(s, s.capitalize()) for s in active_statuses
+                STATUS_LABELS.get(s, s.capitalize()) for s in active_statuses
             ],
             shared_xaxes=True,
             shared_yaxes=True,
@@ -615,21 +984,17 @@ else:
 
             z = status_grids[s]
 
-            # build customdata with counts from every *other* status
-            other_statuses = [os for os in active_statuses if os != s]
-            if other_statuses:
-                cd = np.stack([status_grids[os] for os in other_statuses], axis=-1)
-            else:
-                cd = np.zeros((*z.shape, 1))
+            # customdata with counts from every *other* status
+            other_statuses, cd = heatmap.cross_counts(status_grids, active_statuses, s)
 
             # hover template: show this panel's count bolded, plus all others
             ht_lines = [
                 "Rating Diff: %{x:.0f}<br>Turns: %{y:.0f}<br>",
-                f"<b>{_SPLIT_STATUS_LABELS.get(s, s.capitalize())}: %{{z:.0f}}</b>",
+                f"<b>{STATUS_LABELS.get(s, s.capitalize())}: %{{z:.0f}}</b>",
             ]
-            for i, os in enumerate(other_statuses):
+            for i, other in enumerate(other_statuses):
                 ht_lines.append(
-                    f"{_SPLIT_STATUS_LABELS.get(os, os.capitalize())}: %{{customdata[{i}]:.0f}}"
+                    f"{STATUS_LABELS.get(other, other.capitalize())}: %{{customdata[{i}]:.0f}}"
                 )
             hovertemplate = "<br>".join(ht_lines) + "<extra></extra>"
 
@@ -649,11 +1014,21 @@ else:
                     customdata=cd,
                     hovertemplate=hovertemplate,
                     showscale=False,
-                    name=_SPLIT_STATUS_LABELS.get(s, s.capitalize()),
+                    name=STATUS_LABELS.get(s, s.capitalize()),
                 ),
                 row=row,
                 col=col,
             )
+            if show_personal:
+                fig1.add_trace(
+                    my_games_trace(
+                        my_t1[my_t1["victory_status"] == s],
+                        showlegend=idx == 0,
+                        legendgroup="mine",
+                    ),
+                    row=row,
+                    col=col,
+                )
 
         fig1.update_layout(**PLOTLY_LAYOUT)
         fig1.update_layout(
@@ -690,13 +1065,12 @@ else:
         # y-axis label only on the first (leftmost) panel
         fig1.update_layout(yaxis=dict(title="Number of Turns"))
 
-        st.plotly_chart(fig1, use_container_width=True)
+        show_chart(fig1, "Task 1")
 
 # quick stats for the insight box
-mate_games = filtered_scatter[filtered_scatter["victory_status"] == "mate"]
-resign_games = filtered_scatter[filtered_scatter["victory_status"] == "resign"]
-avg_mate_turns = mate_games["turns"].mean() if len(mate_games) > 0 else 0
-avg_resign_turns = resign_games["turns"].mean() if len(resign_games) > 0 else 0
+timer.lap("Task 1", "insight")
+avg_mate_turns = t1_view["mean_turns"].get("mate", 0)
+avg_resign_turns = t1_view["mean_turns"].get("resign", 0)
 
 st.markdown(
     f"""<div class="insight-box">
@@ -714,6 +1088,7 @@ st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
 # -----------------------------------------------
 # Task 2: White vs Black wins by tier
 # -----------------------------------------------
+timer.lap("Task 2", "data")
 st.markdown(
     '<div class="section-header"><span class="num">02</span> The White Advantage: Real or Myth?</div>',
     unsafe_allow_html=True,
@@ -723,38 +1098,11 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-tier_order = [
-    "1. Novice (<1200)",
-    "2. Intermediate (1200-1499)",
-    "3. Advanced (1500-1799)",
-    "4. Master (1800+)",
-]
-
-# build per-tier percentages (denominator = ALL games including draws)
-t2_rows = []
-for tier in tier_order:
-    tier_data = df_tiers[df_tiers["rating_tier"] == tier]
-    white_count = tier_data[tier_data["winner"] == "white"]["game_count"].values
-    black_count = tier_data[tier_data["winner"] == "black"]["game_count"].values
-    draw_count = tier_data[tier_data["winner"] == "draw"]["game_count"].values
-    wc = int(white_count[0]) if len(white_count) > 0 else 0
-    bc = int(black_count[0]) if len(black_count) > 0 else 0
-    dc = int(draw_count[0]) if len(draw_count) > 0 else 0
-    total = wc + bc + dc
-    friendly = tier.split(". ")[1] if ". " in tier else tier
-    t2_rows.append(
-        {
-            "tier": friendly,
-            "White Win %": wc / total * 100 if total else 0,
-            "Draw %": dc / total * 100 if total else 0,
-            "Black Win %": bc / total * 100 if total else 0,
-            "wc": wc,
-            "bc": bc,
-            "dc": dc,
-            "total": total,
-        }
-    )
+tier_order = tiers.tier_labels(tier_boundaries)
 
+t2_rows, tier_advantages = tier_tables(df_tiers, retier)
+
+timer.lap("Task 2", "figure")
 fig2 = go.Figure()
 
 tier_labels = [r["tier"] for r in t2_rows]
@@ -818,29 +1166,14 @@ fig2.update_layout(
     bargroupgap=0.08,
     legend=dict(orientation="h", yanchor="bottom", y=1.05, xanchor="center", x=0.5),
 )
-st.plotly_chart(fig2, use_container_width=True)
-
-# compute which tier has biggest/smallest white advantage (consistent denominator: W+B+D)
-tier_advantages = []
-for tier in tier_order:
-    td = df_tiers[df_tiers["rating_tier"] == tier]
-    wc = td[td["winner"] == "white"]["game_count"].values
-    bc = td[td["winner"] == "black"]["game_count"].values
-    dc = td[td["winner"] == "draw"]["game_count"].values
-    w = int(wc[0]) if len(wc) > 0 else 0
-    b = int(bc[0]) if len(bc) > 0 else 0
-    d = int(dc[0]) if len(dc) > 0 else 0
-    total = w + b + d
-    w_pct = w / total * 100 if total > 0 else 50
-    b_pct = b / total * 100 if total > 0 else 50
-    d_pct = d / total * 100 if total > 0 else 0
-    tier_advantages.append((tier.split(". ")[1], w_pct, b_pct, d_pct))
-
-max_adv_tier = max(tier_advantages, key=lambda x: x[1])
-min_adv_tier = min(tier_advantages, key=lambda x: x[1])
-
-# draw rate at highest tier
-max_draw_tier = max(tier_advantages, key=lambda x: x[3])
+show_chart(fig2, "Task 2")
+
+# biggest/smallest white advantage (consistent denominator: W+B+D) and highest draw rate
+timer.lap("Task 2", "insight")
+tier_highlights = tiers.advantage_highlights(tier_advantages)
+max_adv_tier = tier_highlights["max_white"]
+min_adv_tier = tier_highlights["min_white"]
+max_draw_tier = tier_highlights["max_draw"]
 
 st.markdown(
     f"""<div class="insight-box">
@@ -855,11 +1188,23 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+if show_personal:
+    my_by_colour = personal.result_by_colour(df_personal)
+    st.markdown(
+        f"""<div class="insight-box">
+    ⭐ <strong>My games:</strong> as White I win <strong>{my_by_colour.loc["white", "win"]:.1f}%</strong>
+    of games, and as Black <strong>{my_by_colour.loc["black", "win"]:.1f}%</strong>
+    (draws: {my_by_colour.loc["white", "draw"]:.1f}% / {my_by_colour.loc["black", "draw"]:.1f}%).
+</div>""",
+        unsafe_allow_html=True,
+    )
+
 st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
 
 # -----------------------------------------------
 # Task 3: Opening analysis
 # -----------------------------------------------
+timer.lap("Task 3", "data")
 st.markdown(
     '<div class="section-header"><span class="num">03</span> Does Opening Choice Affect White\'s Edge?</div>',
     unsafe_allow_html=True,
@@ -869,79 +1214,8 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# aggregate opening stats from the raw data
-opening_stats = []
-for name in df_openings["opening_name"].unique():
-    subset = df_openings[df_openings["opening_name"] == name]
-    total = subset["total_games"].iloc[0]
-    white_wins = subset[subset["winner"] == "white"]["outcome_count"].values
-    black_wins = subset[subset["winner"] == "black"]["outcome_count"].values
-    draws = subset[subset["winner"] == "draw"]["outcome_count"].values
-    ww = int(white_wins[0]) if len(white_wins) > 0 else 0
-    bw = int(black_wins[0]) if len(black_wins) > 0 else 0
-    dd = int(draws[0]) if len(draws) > 0 else 0
-    opening_stats.append(
-        {
-            "opening": name,
-            "total_games": total,
-            "white_wins": ww,
-            "black_wins": bw,
-            "draws": dd,
-            "white_wr": ww / total * 100 if total > 0 else 50,
-            "black_wr": bw / total * 100 if total > 0 else 50,
-            "draw_rate": dd / total * 100 if total > 0 else 0,
-        }
-    )
-
-df_ops = pd.DataFrame(opening_stats).sort_values("total_games", ascending=False)
-df_ops_top = df_ops.head(top_n_openings).sort_values("white_wr", ascending=True)
-
-
-# classify openings by first-move type
-def classify_opening_type(name):
-    """Classify an opening name into 1.e4, 1.d4, or Flank/Irregular."""
-    e4_keywords = [
-        "Sicilian",
-        "French",
-        "Caro-Kann",
-        "Scandinavian",
-        "Italian",
-        "Scotch",
-        "Philidor",
-        "Ruy Lopez",
-        "Petrov",
-        "Pirc",
-        "Alekhine",
-        "King's Gambit",
-        "Vienna",
-        "Bishop's Opening",
-    ]
-    d4_keywords = [
-        "Queen's Pawn",
-        "Queen's Gambit",
-        "Indian",
-        "Slav",
-        "Dutch",
-        "Benoni",
-        "Grunfeld",
-        "Nimzo",
-        "Bogo",
-        "Catalan",
-        "Trompowsky",
-        "London",
-        "Torre",
-        "Colle",
-    ]
-    for kw in e4_keywords:
-        if kw.lower() in name.lower():
-            return "1.e4"
-    for kw in d4_keywords:
-        if kw.lower() in name.lower():
-            return "1.d4"
-    return "Flank / Irregular"
-
-
-df_ops_top["opening_type"] = df_ops_top["opening"].apply(classify_opening_type)
+# slice the popularity-sorted opening table with the sidebar filters
+df_ops_top = top_openings(df_ops, top_n_openings, min_opening_games, opening_search)
 
 OPENING_TYPE_COLORS = {
     "1.e4": "#e11d48",
@@ -949,135 +1223,242 @@ OPENING_TYPE_COLORS = {
     "Flank / Irregular": "#16a34a",
 }
 
-fig3 = go.Figure()
+if df_ops_top.empty:
+    st.info("No openings match the current filters.")
+else:
+    timer.lap("Task 3", "figure")
+    fig3 = go.Figure()
+
+    # lollipop stalks — horizontal lines from 50% to each data point
+    for _, row in df_ops_top.iterrows():
+        stalk_color = OPENING_TYPE_COLORS[row["opening_type"]]
+        fig3.add_shape(
+            type="line",
+            x0=50,
+            x1=row["white_wr"],
+            y0=row["opening"],
+            y1=row["opening"],
+            line=dict(color=stalk_color, width=3, dash="solid"),
+            layer="below",
+            opacity=0.25,
+        )
+
+    # one trace per opening type so the legend shows categories
+    max_games = df_ops_top["total_games"].max()
+    for op_type in ["1.e4", "1.d4", "Flank / Irregular"]:
+        subset = df_ops_top[df_ops_top["opening_type"] == op_type]
+        if subset.empty:
+            continue
+        color = OPENING_TYPE_COLORS[op_type]
+        fig3.add_trace(
+            go.Scatter(
+                x=subset["white_wr"],
+                y=subset["opening"],
+                mode="markers+text",
+                name=op_type,
+                legendgroup=op_type,
+                marker=dict(
+                    size=subset["total_games"] / max_games * 45 + 12,
+                    color=color,
+                    line=dict(color="#ffffff", width=2),
+                ),
+                text=[
+                    f" {wr:.1f}%"
+                    for wr, _ in zip(subset["white_wr"], subset["total_games"])
+                ],
+                textposition="middle right",
+                textfont=dict(color="#334155", size=10, family="IBM Plex Mono"),
+                hovertemplate="<b>%{y}</b><br>Type: "
+                + op_type
+                + "<br>White WR: %{x:.1f}%<br>Games: %{customdata:,}<extra></extra>",
+                customdata=subset["total_games"],
+            )
+        )
+
+    # 50% reference line — strong and clear
+    fig3.add_vline(
+        x=50,
+        line_width=2.5,
+        line_dash="solid",
+        line_color="rgba(0,0,0,0.35)",
+        annotation_text="50%: No Advantage",
+        annotation_position="top right",
+        annotation_font=dict(size=10, color="#64748b"),
+    )
 
-# lollipop stalks — horizontal lines from 50% to each data point
-for _, row in df_ops_top.iterrows():
-    stalk_color = OPENING_TYPE_COLORS[row["opening_type"]]
-    fig3.add_shape(
-        type="line",
+    # shade the "favours white" and "favours black" zones
+    fig3.add_vrect(
         x0=50,
-        x1=row["white_wr"],
-        y0=row["opening"],
-        y1=row["opening"],
-        line=dict(color=stalk_color, width=3, dash="solid"),
+        x1=df_ops_top["white_wr"].max() + 5,
+        fillcolor="rgba(34,197,94,0.04)",
         layer="below",
-        opacity=0.25,
+        line_width=0,
+    )
+    fig3.add_vrect(
+        x0=df_ops_top["white_wr"].min() - 5,
+        x1=50,
+        fillcolor="rgba(239,68,68,0.04)",
+        layer="below",
+        line_width=0,
     )
 
-# one trace per opening type so the legend shows categories
-max_games = df_ops_top["total_games"].max()
-for op_type in ["1.e4", "1.d4", "Flank / Irregular"]:
-    subset = df_ops_top[df_ops_top["opening_type"] == op_type]
-    if subset.empty:
-        continue
-    color = OPENING_TYPE_COLORS[op_type]
-    fig3.add_trace(
-        go.Scatter(
-            x=subset["white_wr"],
-            y=subset["opening"],
-            mode="markers+text",
-            name=op_type,
-            legendgroup=op_type,
-            marker=dict(
-                size=subset["total_games"] / max_games * 45 + 12,
-                color=color,
-                line=dict(color="#ffffff", width=2),
-            ),
-            text=[
-                f" {wr:.1f}%"
-                for wr, _ in zip(subset["white_wr"], subset["total_games"])
+    fig3.update_layout(**PLOTLY_LAYOUT)
+    fig3.update_layout(
+        title="White Win Rate by Opening (colour = opening type, size = popularity)",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.05,
+            xanchor="center",
+            x=0.5,
+            title=dict(text="Opening Type  ", font=dict(size=11)),
+        ),
+        xaxis=dict(
+            title="White Win Rate (%)",
+            gridcolor="rgba(0,0,0,0.04)",
+            range=[
+                df_ops_top["white_wr"].min() - 5,
+                df_ops_top["white_wr"].max() + 14,
             ],
-            textposition="middle right",
-            textfont=dict(color="#334155", size=10, family="IBM Plex Mono"),
-            hovertemplate="<b>%{y}</b><br>Type: "
-            + op_type
-            + "<br>White WR: %{x:.1f}%<br>Games: %{customdata:,}<extra></extra>",
-            customdata=subset["total_games"],
-        )
+        ),
+        yaxis=dict(
+            title="",
+            gridcolor="rgba(0,0,0,0.02)",
+            categoryorder="array",
+            categoryarray=df_ops_top["opening"].tolist(),
+        ),
+        height=max(450, len(df_ops_top) * (40 if len(df_ops_top) <= 20 else 26)),
     )
+    show_chart(fig3, "Task 3")
 
+    # find the best/worst/most popular openings for the insight
+    timer.lap("Task 3", "insight")
+    op_highlights = openings.opening_highlights(df_ops_top)
+    best_opening = op_highlights["best"]
+    worst_opening = op_highlights["worst"]
+    most_popular = op_highlights["most_popular"]
 
-# 50% reference line — strong and clear
-fig3.add_vline(
-    x=50,
-    line_width=2.5,
-    line_dash="solid",
-    line_color="rgba(0,0,0,0.35)",
-    annotation_text="50%: No Advantage",
-    annotation_position="top right",
-    annotation_font=dict(size=10, color="#64748b"),
-)
-
-# shade the "favours white" and "favours black" zones
-fig3.add_vrect(
-    x0=50,
-    x1=df_ops_top["white_wr"].max() + 5,
-    fillcolor="rgba(34,197,94,0.04)",
-    layer="below",
-    line_width=0,
-)
-fig3.add_vrect(
-    x0=df_ops_top["white_wr"].min() - 5,
-    x1=50,
-    fillcolor="rgba(239,68,68,0.04)",
-    layer="below",
-    line_width=0,
-)
-
-fig3.update_layout(**PLOTLY_LAYOUT)
-fig3.update_layout(
-    title="White Win Rate by Opening (colour = opening type, size = popularity)",
-    legend=dict(
-        orientation="h",
-        yanchor="bottom",
-        y=1.05,
-        xanchor="center",
-        x=0.5,
-        title=dict(text="Opening Type  ", font=dict(size=11)),
-    ),
-    xaxis=dict(
-        title="White Win Rate (%)",
-        gridcolor="rgba(0,0,0,0.04)",
-        range=[
-            df_ops_top["white_wr"].min() - 5,
-            df_ops_top["white_wr"].max() + 14,
-        ],
-    ),
-    yaxis=dict(
-        title="",
-        gridcolor="rgba(0,0,0,0.02)",
-        categoryorder="array",
-        categoryarray=df_ops_top["opening"].tolist(),
-    ),
-    height=max(450, top_n_openings * 40),
-)
-st.plotly_chart(fig3, use_container_width=True)
-
-# find the best/worst/most popular openings for the insight
-best_opening = df_ops_top.loc[df_ops_top["white_wr"].idxmax()]
-worst_opening = df_ops_top.loc[df_ops_top["white_wr"].idxmin()]
-most_popular = df_ops_top.loc[df_ops_top["total_games"].idxmax()]
-highest_draw = df_ops_top.loc[df_ops_top["draw_rate"].idxmax()]
-
-st.markdown(
-    f"""<div class="insight-box">
+    st.markdown(
+        f"""<div class="insight-box">
     💡 <strong>Finding:</strong> Opening choice clearly modulates White's edge. White performs best with
     <strong>{best_opening["opening"]}</strong> ({best_opening["white_wr"]:.1f}% WR) and worst with
     <strong>{worst_opening["opening"]}</strong> ({worst_opening["white_wr"]:.1f}%). Notably, the most frequently
     played opening, <strong>{most_popular["opening"]}</strong> ({most_popular["total_games"]} games), is not the
     most effective for White. This suggests that popularity is driven by familiarity rather than competitive advantage.
 </div>""",
+        unsafe_allow_html=True,
+    )
+
+st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+
+# -----------------------------------------------
+# Task 4: Opening theory depth by tier
+# -----------------------------------------------
+timer.lap("Task 4", "data")
+st.markdown(
+    '<div class="section-header"><span class="num">04</span> Opening Theory Depth: Do Stronger Players Stay in Book Longer?</div>',
+    unsafe_allow_html=True,
+)
+st.markdown(
+    '<div class="section-desc">Part of White\'s edge comes from preparation: knowing the main lines lets a player reach a comfortable middlegame. This section compares how many half-moves (plies) each game follows a named opening line, across the four skill tiers.</div>',
     unsafe_allow_html=True,
 )
 
+# loaded lazily: task4_ply_by_tier.csv is only read once this section is opened, and
+# only its per-tier summaries (a few hundred numbers) are sent to the browser
+ply_section = st.expander(
+    "📚 Show opening theory depth by tier", key="show_ply_by_tier", on_change="rerun"
+)
+if ply_section.open:
+    with ply_section:
+        ply_stats = ply_summary(retier)
+
+        TIER_COLORS = ["#c7d2fe", "#a5b4fc", "#6366f1", "#3730a3"]
+        if len(tier_order) != len(TIER_COLORS):
+            TIER_COLORS = sample_colorscale([[0, "#c7d2fe"], [1, "#3730a3"]], len(tier_order))
+        timer.lap("Task 4", "figure")
+        fig4 = go.Figure()
+        median_ply = ply.median_by_tier(ply_stats)
+        for pos, (tier, color) in enumerate(zip(tier_order, TIER_COLORS)):
+            if tier not in ply_stats:
+                continue
+            friendly = tiers.short_tier(tier)
+            stats = ply_stats[tier]
+
+            # violin outline from the server-side KDE, mirrored around the tier position
+            violin_x, violin_y = ply.violin_outline(stats, pos)
+            fig4.add_trace(
+                go.Scatter(
+                    x=violin_x,
+                    y=violin_y,
+                    fill="toself",
+                    fillcolor=color,
+                    opacity=0.8,
+                    mode="lines",
+                    line=dict(color="#312e81", width=1),
+                    name=friendly,
+                    hoverinfo="skip",
+                )
+            )
+            # box from precomputed quartiles / whiskers
+            fig4.add_trace(
+                go.Box(
+                    x=[pos],
+                    q1=[stats["q1"]],
+                    median=[stats["median"]],
+                    q3=[stats["q3"]],
+                    lowerfence=[stats["lowerfence"]],
+                    upperfence=[stats["upperfence"]],
+                    mean=[stats["mean"]],
+                    name=friendly,
+                    width=0.08,
+                    fillcolor="#ffffff",
+                    line=dict(color="#1e1b4b", width=1.5),
+                    boxpoints=False,
+                )
+            )
+
+        fig4.update_layout(**PLOTLY_LAYOUT)
+        fig4.update_layout(
+            title="Opening Ply by Skill Tier",
+            yaxis=dict(
+                title="Opening Ply (half-moves in book)",
+                gridcolor="rgba(0,0,0,0.04)",
+            ),
+            xaxis=dict(
+                title="",
+                tickmode="array",
+                tickvals=list(range(len(tier_order))),
+                ticktext=[tiers.short_tier(t) for t in tier_order],
+            ),
+            showlegend=False,
+            height=480,
+        )
+        show_chart(fig4, "Task 4")
+
+        timer.lap("Task 4", "insight")
+        if median_ply:
+            deepest = max(median_ply, key=median_ply.get)
+            shallowest = min(median_ply, key=median_ply.get)
+            st.markdown(
+                f"""<div class="insight-box">
+    💡 <strong>Finding:</strong> Book depth grows with skill. <strong>{deepest}</strong> games follow a named
+    line for a median of <strong>{median_ply[deepest]:.0f} plies</strong>, against
+    <strong>{median_ply[shallowest]:.0f}</strong> at <strong>{shallowest}</strong> level. Deeper shared theory
+    means both sides reach a balanced middlegame more often, which is consistent with the higher draw rates
+    at the top tiers in Section 02.
+</div>""",
+                unsafe_allow_html=True,
+            )
+
 st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
 
 # -----------------------------------------------
-# Task 4: Upsets - lower rated player winning
+# Task 5: Upsets - lower rated player winning
 # -----------------------------------------------
+timer.lap("Task 5", "data")
 st.markdown(
-    '<div class="section-header"><span class="num">04</span> Rating Gap &amp; Upset Rate: When Does Skill Override Everything?</div>',
+    '<div class="section-header"><span class="num">05</span> Rating Gap &amp; Upset Rate: When Does Skill Override Everything?</div>',
     unsafe_allow_html=True,
 )
 st.markdown(
@@ -1090,35 +1471,17 @@ st.markdown(
 )
 
 # bin the rating gaps
-df_upsets_filtered = df_upsets[df_upsets["rating_gap"] <= max_gap_display].copy()
-df_upsets_filtered["gap_bin"] = (
-    (df_upsets_filtered["rating_gap"] // gap_bin_size) * gap_bin_size
-).astype(int)
-
-upset_by_bin = (
-    df_upsets_filtered.groupby("gap_bin")
-    .apply(
-        lambda g: pd.Series(
-            {
-                "total": len(g),
-                "upsets": (g["outcome_type"] == "Upset (Lower Rated Won)").sum(),
-                "upset_rate": (g["outcome_type"] == "Upset (Lower Rated Won)").mean()
-                * 100,
-            }
-        ),
-        include_groups=False,
-    )
-    .reset_index()
-)
+upset_by_bin = upset_bins(df_upsets, gap_bin_size, max_gap_display)
 
+timer.lap("Task 5", "figure")
 fig5a = make_subplots(specs=[[{"secondary_y": True}]])
 
 upset_rates = upset_by_bin["upset_rate"].values
 game_counts = upset_by_bin["total"].values
 gap_bins = upset_by_bin["gap_bin"].values
 
-# build human-readable range labels for each bin (e.g. "0–49", "50–99")
-bin_labels = [f"{int(b)}–{int(b + gap_bin_size - 1)}" for b in gap_bins]
+# human-readable range labels for each bin (e.g. "0–49", "50–99")
+bin_labels = upsets.bin_labels(gap_bins, gap_bin_size)
 
 # bars showing number of games in each bin (primary y-axis)
 fig5a.add_trace(
@@ -1160,6 +1523,24 @@ fig5a.add_trace(
     secondary_y=True,
 )
 
+# my own upset rate on the same bins (bins with at least 5 of my decisive games)
+my_upset_rates = []
+if show_personal:
+    my_bins = personal.upset_bins(df_personal, gap_bin_size, max_gap_display, gap_bins)
+    my_upset_rates = my_bins["upset_rate"].tolist()
+    fig5a.add_trace(
+        go.Scatter(
+            x=upsets.bin_labels(my_bins["gap_bin"], gap_bin_size),
+            y=my_bins["upset_rate"],
+            mode="markers",
+            name="⭐ My Upset Rate %",
+            marker=MY_MARKER | dict(size=12),
+            customdata=my_bins["total"],
+            hovertemplate="<b>Rating Gap: %{x}</b><br>My Upset Rate: %{y:.1f}% (%{customdata} games)<extra></extra>",
+        ),
+        secondary_y=True,
+    )
+
 fig5a.update_layout(**PLOTLY_LAYOUT)
 fig5a.update_layout(
     title="How Likely Is an Upset as the Rating Gap Grows?",
@@ -1183,30 +1564,20 @@ fig5a.update_yaxes(
 fig5a.update_yaxes(
     title_text="Upset Rate (%)",
     gridcolor="rgba(0,0,0,0.02)",
-    range=[0, max(55, max(upset_rates) + 8)],
+    range=[0, max(55, max([*upset_rates, *my_upset_rates]) + 8)],
     dtick=10,
     showgrid=False,
     secondary_y=True,
 )
 
-st.plotly_chart(fig5a, use_container_width=True)
+show_chart(fig5a, "Task 5")
 
 # upset stats for the insight
-total_upsets = (df_upsets["outcome_type"] == "Upset (Lower Rated Won)").sum()
-total_decisive = len(df_upsets)
-overall_upset_pct = total_upsets / total_decisive * 100
-close_games = df_upsets[df_upsets["rating_gap"] <= 50]
-close_upset_pct = (
-    (close_games["outcome_type"] == "Upset (Lower Rated Won)").mean() * 100
-    if len(close_games) > 0
-    else 0
-)
-big_gap = df_upsets[df_upsets["rating_gap"] >= 400]
-big_gap_upset_pct = (
-    (big_gap["outcome_type"] == "Upset (Lower Rated Won)").mean() * 100
-    if len(big_gap) > 0
-    else 0
-)
+timer.lap("Task 5", "insight")
+upset_stats = upset_summary(df_upsets)
+overall_upset_pct = upset_stats["overall"]
+close_upset_pct = upset_stats["close"]
+big_gap_upset_pct = upset_stats["big_gap"]
 
 st.markdown(
     f"""<div class="insight-box">
@@ -1219,9 +1590,148 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+if show_personal:
+    my_split = personal.upset_split(df_personal)
+    st.markdown(
+        f"""<div class="insight-box">
+    ⭐ <strong>My games:</strong> <strong>{my_split["upset_pct"]:.1f}%</strong> of my decisive
+    games were upsets. As the underdog I won <strong>{my_split["underdog_win_pct"]:.1f}%</strong>
+    ({my_split["underdog_games"]:,} games); as the favourite, <strong>{my_split["favourite_win_pct"]:.1f}%</strong>
+    ({my_split["favourite_games"]:,} games).
+</div>""",
+        unsafe_allow_html=True,
+    )
+
+st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+
+# -----------------------------------------------
+# Task 6: Time control vs outcome
+# -----------------------------------------------
+timer.lap("Task 6", "data")
+st.markdown(
+    '<div class="section-header"><span class="num">06</span> Time Control &amp; How Games End</div>',
+    unsafe_allow_html=True,
+)
+st.markdown(
+    '<div class="section-desc">Faster games leave less time to convert an advantage. This section shows how the mix of game endings (checkmate, resignation, timeout, draw) shifts from bullet to classical, using Lichess\'s estimated-duration buckets (base time + 40 × increment).</div>',
+    unsafe_allow_html=True,
+)
+
+# loaded lazily: task6_time_victory.csv is only read once this section is opened
+time_section = st.expander(
+    "⏱️ Show outcomes by time control", key="show_time_victory", on_change="rerun"
+)
+if time_section.open:
+    with time_section:
+        df_time = load_task_table("task6_time_victory")
+        tc_counts, tc_shares = time_controls.outcome_shares(df_time)
+
+        timer.lap("Task 6", "figure")
+        fig6 = go.Figure()
+        for status in tc_shares.columns:
+            fig6.add_trace(
+                go.Bar(
+                    x=tc_shares.index,
+                    y=tc_shares[status],
+                    name=STATUS_LABELS.get(status, status.capitalize()),
+                    marker=dict(color=VICTORY_COLORS.get(status, COLORS["primary"])),
+                    customdata=tc_counts[status],
+                    hovertemplate="<b>%{x}</b><br>%{fullData.name}: %{y:.1f}% (%{customdata:,} games)<extra></extra>",
+                )
+            )
+
+        fig6.update_layout(**PLOTLY_LAYOUT)
+        fig6.update_layout(
+            barmode="stack",
+            title="How Games End, by Time Control (% of games)",
+            yaxis=dict(
+                title="% of Games", gridcolor="rgba(0,0,0,0.04)", range=[0, 100]
+            ),
+            xaxis=dict(title=""),
+            height=460,
+            legend=dict(orientation="h", yanchor="bottom", y=1.05, xanchor="center", x=0.5),
+        )
+        show_chart(fig6, "Task 6")
+
+        timer.lap("Task 6", "insight")
+        tc_highlights = time_controls.outcome_highlights(tc_shares)
+        if tc_highlights is not None:
+            most_timeouts = tc_highlights["most_timeouts"]
+            most_draws = tc_highlights["most_draws"]
+            st.markdown(
+                f"""<div class="insight-box">
+    💡 <strong>Finding:</strong> Timeouts peak in <strong>{most_timeouts}</strong> games
+    ({tc_shares.loc[most_timeouts, "outoftime"]:.1f}% of results), where the clock can decide a game
+    regardless of the position. Draws are most common in <strong>{most_draws}</strong>
+    ({tc_shares.loc[most_draws, "draw"]:.1f}%): with more time, defenders find the resources to hold,
+    which further dilutes White's first-move edge.
+</div>""",
+                unsafe_allow_html=True,
+            )
+
+        if show_personal:
+            my_tc_counts, my_tc_shares = personal.time_control_shares(df_personal)
+            my_timeouts = ", ".join(
+                f"{category} <strong>{my_tc_shares.loc[category, 'outoftime']:.1f}%</strong>"
+                f" ({my_tc_counts.loc[category].sum():,} games)"
+                for category in my_tc_shares.index
+            )
+            st.markdown(
+                f"""<div class="insight-box">
+    ⭐ <strong>My games:</strong> share decided on time, by time control: {my_timeouts}.
+</div>""",
+                unsafe_allow_html=True,
+            )
+
 st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
 
 
+# -----------------------------------------------
+# Personal performance summary (overlay only)
+# -----------------------------------------------
+if show_personal:
+    timer.lap("My Performance", "data")
+    st.markdown(
+        '<div class="section-header"><span class="num">⭐</span> My Performance Summary</div>',
+        unsafe_allow_html=True,
+    )
+    my_summary = personal.performance_summary(df_personal)
+    st.markdown(
+        f"""<div class="kpi-container">
+    <div class="kpi-card"><div class="kpi-icon">♟️</div><div class="kpi-value">{my_summary["games"]:,}</div><div class="kpi-label">Games</div></div>
+    <div class="kpi-card"><div class="kpi-icon">🏆</div><div class="kpi-value">{my_summary["win_pct"]:.1f}%</div><div class="kpi-label">Win Rate</div></div>
+    <div class="kpi-card"><div class="kpi-icon">📈</div><div class="kpi-value">{my_summary["current_rating"]}</div><div class="kpi-label">Current Rating</div></div>
+    <div class="kpi-card"><div class="kpi-icon">⛰️</div><div class="kpi-value">{my_summary["peak_rating"]}</div><div class="kpi-label">Peak Rating</div></div>
+</div>""",
+        unsafe_allow_html=True,
+    )
+
+    timer.lap("My Performance", "figure")
+    fig_me = go.Figure()
+    fig_me.add_trace(
+        go.Scatter(
+            x=df_personal["start_time"],
+            y=df_personal["my_rating"],
+            mode="lines+markers",
+            name="My Rating",
+            line=dict(color="#eab308", width=2),
+            marker=MY_MARKER | dict(size=5),
+            hovertemplate="%{x|%d %b %Y}<br>Rating: %{y}<extra></extra>",
+        )
+    )
+    fig_me.update_layout(**PLOTLY_LAYOUT)
+    fig_me.update_layout(
+        title="Rating Progression",
+        yaxis=dict(title="Rating", gridcolor="rgba(0,0,0,0.04)"),
+        xaxis=dict(title="", gridcolor="rgba(0,0,0,0.04)"),
+        height=420,
+        showlegend=False,
+    )
+    show_chart(fig_me, "My Performance")
+
+    st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+
+
 # -- footer --
 st.markdown(
     """<div class="footer">
@@ -1229,3 +1739,32 @@ st.markdown(
 </div>""",
     unsafe_allow_html=True,
 )
+
+# -- render timing / profile (opt-in) --
+timer.stop()
+if PROFILING:
+    timer.log(view=heatmap_view, overlay=show_personal, profiled=profiler is not None)
+    if profiler is not None:
+        st.session_state["rerun_profile"] = profiling.finish_profile(profiler)
+    with timing_slot.container():
+        with st.expander("⏱️ Render Timing", expanded=True):
+            st.dataframe(timer.table(), use_container_width=True)
+            st.caption(
+                "Milliseconds per section this run: data prep, Plotly figure construction, "
+                "st.plotly_chart (JSON serialization) and insight boxes. Cached steps show "
+                "near zero. Also logged as JSON by lichess_insights.profiling."
+            )
+            st.button(
+                "Profile a Rerun",
+                on_click=lambda: st.session_state.update(profile_next_run=True),
+                help="Rerun the page under cProfile. Timings for that run include profiler overhead.",
+            )
+            if "rerun_profile" in st.session_state:
+                prof_bytes, prof_report = st.session_state["rerun_profile"]
+                st.download_button(
+                    "Download .prof",
+                    prof_bytes,
+                    file_name="rerun.prof",
+                    help="Open with snakeviz or python -m pstats.",
+                )
+                st.code(prof_report, language=None)
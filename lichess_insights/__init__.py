@@ -0,0 +1 @@
+"""Headless data layer for the Lichess Insights dashboard (no Streamlit imports)."""
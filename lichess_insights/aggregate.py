@@ -0,0 +1,206 @@
+"""
+Build the six task tables from a raw games file, in-process with pandas.
+
+This is a drop-in replacement for running data_aggr.sql against MySQL: each
+task_* function mirrors one query and returns the same columns.
+
+Usage: python -m lichess_insights.aggregate chess.csv [--out .] [--format csv|parquet|feather]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from lichess_insights.tables import read_file
+from lichess_insights.upsets import EXPECTED, UPSET
+
+TIER_LABELS = [
+    "1. Novice (<1200)",
+    "2. Intermediate (1200-1499)",
+    "3. Advanced (1500-1799)",
+    "4. Master (1800+)",
+]
+
+# the Lichess Kaggle export uses different names for a few converter columns
+COLUMN_ALIASES = {
+    "id": "game_id",
+    "increment_code": "time_increment",
+    "created_at": "start_time",
+    "last_move_at": "end_time",
+}
+
+
+def load_games(path):
+    """Read a raw games table (.csv, .parquet or .feather) and normalise its column names."""
+    games = read_file(path)
+    return games.rename(
+        columns={k: v for k, v in COLUMN_ALIASES.items() if k in games and v not in games}
+    )
+
+
+def rating_tier(games):
+    """
+    Label each game with its rating tier, following the SQL CASE exactly.
+    The average is not rounded, so a x.5 average that falls between two
+    BETWEEN bands (e.g. 1499.5) lands in the ELSE branch, as it does in MySQL.
+    """
+    avg = (games["white_rating"].astype("float64") + games["black_rating"]) / 2
+    conditions = [
+        avg < 1200,
+        (avg >= 1200) & (avg <= 1499),
+        (avg >= 1500) & (avg <= 1799),
+    ]
+    return pd.Series(
+        np.select(conditions, TIER_LABELS[:3], default=TIER_LABELS[3]), index=games.index
+    )
+
+
+def _decisive(games):
+    return games[games["winner"].isin(["white", "black"])]
+
+
+def task1_scatter(games):
+    """Rating diff, turns and victory status for decisive mate/resign/outoftime games."""
+    g = _decisive(games)
+    g = g[g["victory_status"].isin(["mate", "resign", "outoftime"])]
+    return pd.DataFrame(
+        {
+            "game_id": g["game_id"],
+            "rating_diff": g["white_rating"].astype("int64") - g["black_rating"],
+            "turns": g["turns"],
+            "victory_status": g["victory_status"],
+        }
+    ).reset_index(drop=True)
+
+
+def task2_tiers(games):
+    """Game counts per (rating_tier, winner)."""
+    return (
+        pd.DataFrame({"rating_tier": rating_tier(games), "winner": games["winner"]})
+        .groupby(["rating_tier", "winner"], sort=False, observed=True)
+        .size()
+        .reset_index(name="game_count")
+    )
+
+
+def task3_openings(games, top_n=15):
+    """Outcome counts per winner for the top_n most-played openings (all of them if None)."""
+    totals = games["opening_name"].value_counts(sort=False)
+    # stable sort so ties keep first-appearance order
+    top = totals.sort_values(ascending=False, kind="stable")
+    if top_n is not None:
+        top = top.head(top_n)
+    g = games[games["opening_name"].isin(top.index)]
+    out = (
+        g.groupby(["opening_name", "winner"], sort=False, observed=True)
+        .size()
+        .reset_index(name="outcome_count")
+    )
+    out["total_games"] = out["opening_name"].map(top).astype("int64")
+    return out
+
+
+def task4_ply_by_tier(games):
+    """Opening ply of every game, labelled with its rating tier."""
+    return pd.DataFrame(
+        {"rating_tier": rating_tier(games), "opening_ply": games["opening_ply"].astype("Int64")}
+    ).reset_index(drop=True)
+
+
+def task5_upsets(games):
+    """Absolute rating gap and upset/expected classification for decisive games."""
+    g = _decisive(games)
+    white = g["white_rating"].astype("int64")
+    black = g["black_rating"].astype("int64")
+    upset = ((white > black) & (g["winner"] == "black")) | (
+        (black > white) & (g["winner"] == "white")
+    )
+    return pd.DataFrame(
+        {
+            "rating_gap": (white - black).abs(),
+            "outcome_type": np.where(upset, UPSET, EXPECTED),
+        }
+    ).reset_index(drop=True)
+
+
+def task6_time_victory(games):
+    """Game counts per (time_increment, victory_status)."""
+    return (
+        games.groupby(["time_increment", "victory_status"], sort=False, observed=True)
+        .size()
+        .reset_index(name="game_count")
+    )
+
+
+def opening_outcomes(games):
+    """task3_openings without the LIMIT: every opening, rows sorted most-played first."""
+    out = task3_openings(games, top_n=None)
+    return out.sort_values("total_games", ascending=False, kind="stable", ignore_index=True)
+
+
+def game_ratings(games):
+    """Average rating, winner and opening ply per game, for re-tiering at runtime (see tiers.py)."""
+    return pd.DataFrame(
+        {
+            "avg_rating": (games["white_rating"].astype("float64") + games["black_rating"]) / 2,
+            "winner": games["winner"],
+            "opening_ply": games["opening_ply"].astype("Int64"),
+        }
+    ).reset_index(drop=True)
+
+
+TASK_BUILDERS = {
+    "task1_scatter": task1_scatter,
+    "task2_tiers": task2_tiers,
+    "task3_openings": task3_openings,
+    "task4_ply_by_tier": task4_ply_by_tier,
+    "task5_upsets": task5_upsets,
+    "task6_time_victory": task6_time_victory,
+    "opening_outcomes": opening_outcomes,
+    "game_ratings": game_ratings,
+}
+
+
+def build_all(games):
+    """Run every task builder and return {task_name: DataFrame}."""
+    return {name: build(games) for name, build in TASK_BUILDERS.items()}
+
+
+def write_all(tables, out_dir=".", fmt="csv"):
+    """Write each task table as <out_dir>/<task_name>.<fmt>."""
+    for name, df in tables.items():
+        path = os.path.join(out_dir, f"{name}.{fmt}")
+        if fmt == "csv":
+            df.to_csv(path, index=False)
+            continue
+        # string columns are low-cardinality labels, store them as categoricals
+        labels = [c for c in df.columns if pd.api.types.is_string_dtype(df[c])]
+        df = df.astype({c: "category" for c in labels})
+        if fmt == "parquet":
+            df.to_parquet(path, index=False)
+        else:
+            df.to_feather(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build the dashboard task tables from a raw games file."
+    )
+    parser.add_argument("games", help="raw games file (.csv, .parquet or .feather)")
+    parser.add_argument("--out", default=".", help="output directory")
+    parser.add_argument("--format", choices=["csv", "parquet", "feather"], default="csv")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    games = load_games(args.games)
+    tables = build_all(games)
+    write_all(tables, args.out, args.format)
+    elapsed = time.perf_counter() - t0
+    print(f"Aggregated {len(games):,} games into {len(tables)} tables in {elapsed:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+Benchmark suite for the dashboard data pipeline, run headlessly (no Streamlit).
+
+For each size a synthetic raw games table is generated with the columns of
+chess.csv, aggregated into the task tables with aggregate.py (so they have
+exactly the task CSV schemas) and written to a temporary data directory.
+Every stage the app runs on a rerun or at start-up is then timed on it:
+loading the tables and the game store, the Task 1 cube/index and filters,
+the tier, opening and upset tables, and pgn_to_csv on a PGN built by
+repeating the bundled export. Results are saved as JSON; --compare reports
+the change against an earlier run (e.g. one from the previous commit).
+
+Usage:
+    python -m lichess_insights.bench [--sizes 20000 1000000 10000000] [--repeat 3]
+                                     [--stages ...] [--out bench_results.json]
+                                     [--compare old.json] [--threshold 1.25]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from lichess_insights import (
+    aggregate,
+    filters,
+    heatmap,
+    openings,
+    ply,
+    store,
+    tables,
+    tiers,
+    time_controls,
+    upsets,
+    users,
+)
+
+DEFAULT_SIZES = (20_000, 1_000_000, 10_000_000)
+# pgn_to_csv runs at tens of thousands of games/sec, so its input is capped
+DEFAULT_PGN_GAMES = 50_000
+BUNDLED_PGN = os.path.join(os.path.dirname(users.CONVERTER), "shanew012_games.pgn")
+
+VICTORY_STATUSES = ["mate", "resign", "outoftime", "draw"]
+STATUS_WEIGHTS = [0.32, 0.55, 0.08, 0.05]
+TIME_CONTROLS = ["1+0", "2+1", "3+0", "3+2", "5+0", "5+3", "10+0", "10+5", "15+0", "15+15", "30+0"]
+OPENING_FAMILIES = [
+    "Sicilian Defense",
+    "French Defense",
+    "Caro-Kann Defense",
+    "Scandinavian Defense",
+    "Italian Game",
+    "Ruy Lopez",
+    "Queen's Gambit",
+    "King's Indian Defense",
+    "Slav Defense",
+    "London System",
+    "English Opening",
+    "Van't Kruijs Opening",
+]
+
+
+# -- synthetic data --
+
+
+def _game_ids(n):
+    """n distinct 8-character base-36 ids, like Lichess game ids."""
+    alphabet = np.frombuffer(b"0123456789abcdefghijklmnopqrstuvwxyz", dtype=np.uint8)
+    ids = np.empty((n, 8), dtype=np.uint8)
+    rest = np.arange(n, dtype=np.int64)
+    for pos in range(7, -1, -1):
+        rest, digit = np.divmod(rest, 36)
+        ids[:, pos] = alphabet[digit]
+    return ids.view("S8").ravel().astype(str)
+
+
+def synthetic_games(n, seed=0):
+    """A raw games table of n rows with the chess.csv columns the task tables read."""
+    rng = np.random.default_rng(seed)
+    white = np.clip(rng.normal(1590, 290, n), 800, 2700).astype(np.int64)
+    black = np.clip(white + rng.normal(0, 170, n), 800, 2700).astype(np.int64)
+    status = rng.choice(len(VICTORY_STATUSES), n, p=STATUS_WEIGHTS)
+    winner = np.where(status == 3, 2, (rng.random(n) > 0.52).astype(np.int64))
+
+    # a few thousand openings with Zipf-like popularity, as in the Lichess data
+    names = [f"{family}: Variation {i}" for i in range(250) for family in OPENING_FAMILIES]
+    popularity = 1 / np.arange(1, len(names) + 1)
+    opening = rng.choice(len(names), n, p=popularity / popularity.sum())
+
+    return pd.DataFrame(
+        {
+            "game_id": _game_ids(n),
+            "turns": np.clip(rng.gamma(4, 15, n), 1, 349).astype(np.int64),
+            "victory_status": pd.Categorical.from_codes(status, VICTORY_STATUSES),
+            "winner": pd.Categorical.from_codes(winner, tiers.WINNERS),
+            "time_increment": pd.Categorical.from_codes(
+                rng.integers(len(TIME_CONTROLS), size=n), TIME_CONTROLS
+            ),
+            "white_rating": white,
+            "black_rating": black,
+            "opening_name": pd.Categorical.from_codes(opening, names),
+            "opening_ply": rng.integers(1, 29, n),
+        }
+    )
+
+
+def synthetic_pgn(path, n_games, source=BUNDLED_PGN):
+    """Write n_games PGN games to path by repeating the games of the bundled export."""
+    with open(source, encoding="utf-8") as f:
+        text = f.read()
+    games = ["[Event " + g.rstrip() + "\n\n" for g in text.split("[Event ")[1:]]
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n_games):
+            f.write(games[i % len(games)])
+
+
+@dataclass
+class Fixture:
+    """One benchmark size: the raw games, their task tables on disk and the prepared inputs."""
+
+    rows: int
+    data_dir: str
+    games: pd.DataFrame
+    tables: dict
+    store: store.GameStore
+    cube: heatmap.CountCube
+    index: filters.GameIndex
+    rating_tiers: tiers.RatingTiers
+    df_ops: pd.DataFrame
+    pgn_path: str
+    pgn_games: int
+
+
+# tables the app reads at start-up (the rest are lazy or only used by aggregate)
+STARTUP_TABLES = ("task1_scatter", "task2_tiers", "task3_openings", "task5_upsets", "opening_outcomes")
+
+
+def prepare(rows, work_dir, fmt="csv", pgn_games=DEFAULT_PGN_GAMES):
+    """Generate, aggregate and write the data for one size. Not timed."""
+    data_dir = os.path.join(work_dir, str(rows))
+    os.makedirs(data_dir, exist_ok=True)
+    games = synthetic_games(rows)
+    task_tables = aggregate.build_all(games)
+    aggregate.write_all({t: task_tables[t] for t in STARTUP_TABLES}, data_dir, fmt)
+
+    game_store = store.build_store(task_tables["task1_scatter"], task_tables["task5_upsets"])
+    scatter = game_store.scatter
+    pgn_games = min(rows, pgn_games)
+    pgn_path = os.path.join(data_dir, "games.pgn")
+    synthetic_pgn(pgn_path, pgn_games)
+    return Fixture(
+        rows=rows,
+        data_dir=data_dir,
+        games=games,
+        tables=task_tables,
+        store=game_store,
+        cube=heatmap.build_cube(scatter["rating_diff"], scatter["turns"], scatter["victory_status"]),
+        index=filters.build_index(scatter["turns"], scatter["rating_diff"], scatter["victory_status"]),
+        rating_tiers=tiers.build_rating_tiers(
+            task_tables["game_ratings"]["avg_rating"],
+            task_tables["game_ratings"]["winner"],
+            task_tables["game_ratings"]["opening_ply"],
+        ),
+        df_ops=openings.opening_stats(task_tables["opening_outcomes"]),
+        pgn_path=pgn_path,
+        pgn_games=pgn_games,
+    )
+
+
+# -- stages --
+# name -> (setup, run); setup(fx) is called before every timed run(fx) and is
+# not timed itself. Filter settings are the app's defaults or a typical narrow
+# selection.
+
+NARROW_FILTER = (("mate", "resign"), (20, 60), (100, 300))
+
+
+def _read_startup_tables(fx):
+    for stem in STARTUP_TABLES:
+        tables.read_table(stem, fx.data_dir)
+
+
+def _drop_store_cache(fx):
+    shutil.rmtree(os.path.join(fx.data_dir, store.CACHE_DIRNAME), ignore_errors=True)
+
+
+def _warm_store_cache(fx):
+    store.load_store(fx.data_dir)
+
+
+def _pgn_to_csv(fx):
+    with contextlib.redirect_stdout(io.StringIO()):
+        users._converter().pgn_to_csv(fx.pgn_path, os.path.join(fx.data_dir, "pgn_games.csv"))
+
+
+def _nothing(fx):
+    pass
+
+
+def _build_cube(fx):
+    df = fx.store.scatter
+    return heatmap.build_cube(df["rating_diff"], df["turns"], df["victory_status"])
+
+
+def _build_index(fx):
+    df = fx.store.scatter
+    return filters.build_index(df["turns"], df["rating_diff"], df["victory_status"])
+
+
+STAGES = {
+    "aggregate": (_nothing, lambda fx: aggregate.build_all(fx.games)),
+    "load_data": (_nothing, _read_startup_tables),
+    "store_cold": (_drop_store_cache, lambda fx: store.load_store(fx.data_dir)),
+    "store_warm": (_warm_store_cache, lambda fx: store.load_store(fx.data_dir)),
+    "task1_cube": (_nothing, _build_cube),
+    "task1_view": (
+        _nothing,
+        lambda fx: heatmap.view(fx.cube, tuple(fx.cube.statuses), (1, 349), (0, 1600), 100, 80),
+    ),
+    "task1_view_narrow": (_nothing, lambda fx: heatmap.view(fx.cube, *NARROW_FILTER, 100, 80)),
+    "task1_index": (_nothing, _build_index),
+    "task1_select": (_nothing, lambda fx: filters.select_rows(fx.index, *NARROW_FILTER)),
+    "tier_table": (_nothing, lambda fx: tiers.tier_table(fx.tables["task2_tiers"])),
+    "retier": (
+        _nothing,
+        lambda fx: tiers.tier_counts(fx.rating_tiers, (1000, 1300, 1600, 1900, 2200)),
+    ),
+    "ply_summary": (_nothing, lambda fx: ply.ply_by_tier_summary(fx.tables["task4_ply_by_tier"])),
+    "opening_stats": (_nothing, lambda fx: openings.opening_stats(fx.tables["opening_outcomes"])),
+    "top_openings": (_nothing, lambda fx: openings.top_openings(fx.df_ops, 12, 0, "")),
+    "upset_by_bin": (_nothing, lambda fx: upsets.upset_rate_by_bin(fx.store.upsets, 50, 800)),
+    "time_controls": (
+        _nothing,
+        lambda fx: time_controls.outcome_shares(fx.tables["task6_time_victory"]),
+    ),
+    "pgn_to_csv": (_nothing, _pgn_to_csv),
+}
+
+
+def time_stage(fx, name, repeat):
+    """Best and median wall time of repeat runs of one stage, in seconds."""
+    setup, run = STAGES[name]
+    times = timeit.repeat(lambda: run(fx), setup=lambda: setup(fx), number=1, repeat=repeat)
+    return {
+        "stage": name,
+        "rows": fx.pgn_games if name == "pgn_to_csv" else fx.rows,
+        "best_s": min(times),
+        "median_s": float(np.median(times)),
+        "repeat": repeat,
+    }
+
+
+# -- results --
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(old, new, threshold):
+    """
+    (stage, rows, old best, new best, ratio) for every result in both runs,
+    and whether any stage got slower than old best x threshold.
+    """
+    before = {(r["stage"], r["rows"]): r["best_s"] for r in old["results"]}
+    report, regressed = [], False
+    for r in new["results"]:
+        key = (r["stage"], r["rows"])
+        if key not in before:
+            continue
+        ratio = r["best_s"] / before[key] if before[key] else float("inf")
+        regressed |= ratio > threshold
+        report.append((*key, before[key], r["best_s"], ratio))
+    return report, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--format", choices=["csv", "parquet", "feather"], default="csv")
+    parser.add_argument("--pgn-games", type=int, default=DEFAULT_PGN_GAMES)
+    parser.add_argument("--out", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=1.25, help="slowdown ratio that counts as a regression"
+    )
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="lichess-bench-") as work_dir:
+        for rows in args.sizes:
+            t0 = time.perf_counter()
+            fx = prepare(rows, work_dir, args.format, args.pgn_games)
+            print(f"\n{rows:,} games (setup {time.perf_counter() - t0:.1f}s)")
+            for name in args.stages:
+                r = time_stage(fx, name, args.repeat)
+                results.append(r)
+                print(
+                    f"  {name:>18}: {r['best_s'] * 1000:10.2f} ms best"
+                    f"  {r['median_s'] * 1000:10.2f} ms median  ({r['rows']:,} rows)"
+                )
+            del fx
+
+    run = {"environment": environment(), "format": args.format, "results": results}
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    print(f"\nSaved {len(results)} results to {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        report, regressed = compare(old, run, args.threshold)
+        print(f"\nvs {args.compare} (commit {old['environment'].get('commit')}):")
+        for stage, rows, before, after, ratio in report:
+            flag = "  SLOWER" if ratio > args.threshold else ""
+            print(
+                f"  {stage:>18} {rows:>11,}: {before * 1000:10.2f} -> {after * 1000:10.2f} ms"
+                f"  {ratio:5.2f}x{flag}"
+            )
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
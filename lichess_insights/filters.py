@@ -0,0 +1,101 @@
+"""
+Row-level filter engine for the Task 1 sidebar controls.
+
+The heatmaps only need counts (see heatmap.py); this is for when the actual
+matching games are needed, e.g. the sampled scatter. At load time the games
+get two sorted indexes, on turns and on |rating_diff|, and one packed bitmap
+per victory status. A filter then resolves each range through searchsorted
+to a slice of row ids, walks only the narrower slice while probing the other
+range and the OR of the selected status bitmaps by row id, so its cost
+follows the size of the matching ranges rather than the table.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class GameIndex:
+    turns: np.ndarray  # per row
+    abs_rating_diff: np.ndarray  # per row
+    turns_order: np.ndarray  # row ids sorted by turns
+    turns_sorted: np.ndarray
+    diff_order: np.ndarray  # row ids sorted by |rating_diff|
+    diff_sorted: np.ndarray
+    status_bits: dict  # {victory_status: np.packbits(row has that status)}
+
+    def __len__(self):
+        return len(self.turns)
+
+
+def _sorted_index(values):
+    order = np.argsort(values, kind="stable").astype(np.int32)
+    return order, values[order]
+
+
+def build_index(turns, rating_diff, victory_status):
+    """Sort the filter columns and pack the status bitmaps once."""
+    turns = np.asarray(turns)
+    abs_rating_diff = np.abs(np.asarray(rating_diff))
+    statuses = np.asarray(victory_status, dtype=str)
+    turns_order, turns_sorted = _sorted_index(turns)
+    diff_order, diff_sorted = _sorted_index(abs_rating_diff)
+    return GameIndex(
+        turns=turns,
+        abs_rating_diff=abs_rating_diff,
+        turns_order=turns_order,
+        turns_sorted=turns_sorted,
+        diff_order=diff_order,
+        diff_sorted=diff_sorted,
+        status_bits={s: np.packbits(statuses == s) for s in np.unique(statuses)},
+    )
+
+
+def _range_slice(sorted_values, value_range):
+    """Positions of lo <= value <= hi in a sorted array."""
+    lo, hi = value_range
+    if np.issubdtype(sorted_values.dtype, np.integer):
+        info = np.iinfo(sorted_values.dtype)
+        if lo > info.max or hi < info.min:
+            return slice(0, 0)
+        lo, hi = max(lo, info.min), min(hi, info.max)
+    # keys in the array's own dtype, otherwise searchsorted converts the whole array
+    key = sorted_values.dtype.type
+    start = np.searchsorted(sorted_values, key(lo), side="left")
+    stop = np.searchsorted(sorted_values, key(hi), side="right")
+    return slice(start, max(start, stop))
+
+
+def _test_bits(bits, rows):
+    return ((bits[rows >> 3] >> (7 - (rows & 7))) & 1).astype(bool)
+
+
+def select_rows(index, statuses, turn_range, abs_diff_range):
+    """Sorted row ids of the games matching the Task 1 filters (inclusive ranges)."""
+    by_turns = _range_slice(index.turns_sorted, turn_range)
+    by_diff = _range_slice(index.diff_sorted, abs_diff_range)
+
+    # walk the narrower range, probe the other one by row id
+    if by_turns.stop - by_turns.start <= by_diff.stop - by_diff.start:
+        rows = index.turns_order[by_turns]
+        other = index.abs_rating_diff[rows]
+        rows = rows[(other >= abs_diff_range[0]) & (other <= abs_diff_range[1])]
+    else:
+        rows = index.diff_order[by_diff]
+        other = index.turns[rows]
+        rows = rows[(other >= turn_range[0]) & (other <= turn_range[1])]
+
+    selected = [index.status_bits[s] for s in statuses if s in index.status_bits]
+    if len(selected) < len(index.status_bits):
+        if not selected:
+            return rows[:0]
+        rows = rows[_test_bits(np.bitwise_or.reduce(selected), rows)]
+    return np.sort(rows)
+
+
+def sample_rows(rows, n_rows, seed=0):
+    """At most n_rows of the selected row ids, sampled without replacement, in row order."""
+    if len(rows) <= n_rows:
+        return rows
+    return np.sort(np.random.default_rng(seed).choice(rows, n_rows, replace=False))
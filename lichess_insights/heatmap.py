@@ -0,0 +1,146 @@
+"""
+Precomputed count cube for the Task 1 heatmaps.
+
+Games are counted once into a (victory_status, rating_diff, turns) cube at
+unit resolution, so the sidebar filters become slices of the cube and the
+displayed heatmaps are re-binned from it. Neither depends on the number of
+games, only on the rating/turn ranges.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CountCube:
+    """Game counts indexed by [status, rating_diff, turns]."""
+
+    statuses: tuple
+    rating_diffs: np.ndarray  # consecutive integers, one per cube column
+    turns: np.ndarray  # consecutive integers, one per cube row
+    counts: np.ndarray  # shape (len(statuses), len(rating_diffs), len(turns))
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+
+def build_cube(rating_diff, turns, victory_status):
+    """Count games into a CountCube (one bincount pass over the data)."""
+    rating_diff = np.asarray(rating_diff, dtype=np.int64)
+    turns = np.asarray(turns, dtype=np.int64)
+    statuses, status_idx = np.unique(np.asarray(victory_status, dtype=str), return_inverse=True)
+
+    rd_min, rd_max = int(rating_diff.min()), int(rating_diff.max())
+    t_min, t_max = int(turns.min()), int(turns.max())
+    n_rd, n_t = rd_max - rd_min + 1, t_max - t_min + 1
+
+    flat = (status_idx * n_rd + (rating_diff - rd_min)) * n_t + (turns - t_min)
+    counts = np.bincount(flat, minlength=len(statuses) * n_rd * n_t)
+    return CountCube(
+        statuses=tuple(statuses.tolist()),
+        rating_diffs=np.arange(rd_min, rd_max + 1),
+        turns=np.arange(t_min, t_max + 1),
+        counts=counts.reshape(len(statuses), n_rd, n_t).astype(np.int32),
+    )
+
+
+def select(cube, statuses, turn_range, abs_diff_range):
+    """Apply the Task 1 sidebar filters (inclusive ranges) by slicing the cube."""
+    keep = [i for i, s in enumerate(cube.statuses) if s in statuses]
+    t0 = np.searchsorted(cube.turns, turn_range[0], side="left")
+    t1 = np.searchsorted(cube.turns, turn_range[1], side="right")
+    abs_rd = np.abs(cube.rating_diffs)
+    rd_mask = (abs_rd >= abs_diff_range[0]) & (abs_rd <= abs_diff_range[1])
+
+    counts = cube.counts[keep, :, t0:t1] * rd_mask[None, :, None]
+    return CountCube(
+        statuses=tuple(cube.statuses[i] for i in keep),
+        rating_diffs=cube.rating_diffs,
+        turns=cube.turns[t0:t1],
+        counts=counts,
+    )
+
+
+def _bin_matrix(values, edges):
+    """One-hot (len(values), n_bins) matrix assigning values to histogram bins."""
+    n_bins = len(edges) - 1
+    idx = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, n_bins - 1)
+    m = np.zeros((len(values), n_bins))
+    m[np.arange(len(values)), idx] = 1
+    return m
+
+
+def rebin(cube, nbx, nby):
+    """
+    Re-bin a cube into nbx x nby display bins spanning the occupied range,
+    like np.histogram2d over the underlying games would.
+
+    Returns ({status: grid of shape (nby, nbx)}, x_centers, y_centers), or
+    None if the cube is empty.
+    """
+    occupied = cube.counts.sum(axis=0)
+    if not occupied.any():
+        return None
+    xs = np.flatnonzero(occupied.any(axis=1))
+    ys = np.flatnonzero(occupied.any(axis=0))
+    rds = cube.rating_diffs[xs[0] : xs[-1] + 1]
+    turns = cube.turns[ys[0] : ys[-1] + 1]
+    counts = cube.counts[:, xs[0] : xs[-1] + 1, ys[0] : ys[-1] + 1]
+
+    x_edges = np.linspace(rds[0], rds[-1], nbx + 1)
+    y_edges = np.linspace(turns[0], turns[-1], nby + 1)
+    bx = _bin_matrix(rds, x_edges)
+    by = _bin_matrix(turns, y_edges)
+
+    grids = {s: (bx.T @ counts[i] @ by).T for i, s in enumerate(cube.statuses)}
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+    return grids, x_centers, y_centers
+
+
+def grid_shape(budget, max_shape, n_panels=1):
+    """
+    Largest (nbx, nby) up to max_shape, with the same aspect ratio, whose
+    cells across n_panels heatmaps fit within a payload budget.
+    """
+    nbx, nby = max_shape
+    per_panel = budget / max(n_panels, 1)
+    if nbx * nby <= per_panel:
+        return nbx, nby
+    scale = (per_panel / (nbx * nby)) ** 0.5
+    return max(1, int(nbx * scale)), max(1, int(nby * scale))
+
+
+def mean_turns(cube, status):
+    """Average game length for one status in the (filtered) cube, 0 if it has no games."""
+    if status not in cube.statuses:
+        return 0
+    per_turn = cube.counts[cube.statuses.index(status)].sum(axis=0)
+    n = per_turn.sum()
+    return float(per_turn @ cube.turns / n) if n else 0
+
+
+def cross_counts(grids, statuses, status):
+    """
+    The other statuses and their grids stacked along a last axis, shape
+    (nby, nbx, len(others)), so a split panel can show every count on hover.
+    """
+    others = [s for s in statuses if s != status]
+    if not others:
+        return others, np.zeros((*grids[status].shape, 1))
+    return others, np.stack([grids[s] for s in others], axis=-1)
+
+
+def view(cube, statuses, turn_range, abs_diff_range, nbx, nby):
+    """
+    Everything Task 1 draws for one filter setting: per-status totals, mean
+    turns and the re-binned grids (see rebin). Small enough to cache.
+    """
+    sub = select(cube, statuses, turn_range, abs_diff_range)
+    return {
+        "totals": dict(zip(sub.statuses, sub.counts.sum(axis=(1, 2)).tolist())),
+        "mean_turns": {s: mean_turns(sub, s) for s in sub.statuses},
+        "bins": rebin(sub, nbx, nby),
+    }
@@ -0,0 +1,120 @@
+"""
+Background conversion of uploaded PGN files.
+
+The Streamlit script only submits an upload and polls its Job; the
+conversion itself (users.ingest) runs on a small thread pool shared by every
+session, so a large upload never blocks a script run. At most MAX_RUNNING
+jobs run at once and at most MAX_PENDING more may wait; past that, submit
+raises QueueFull so a burst of uploads is turned away instead of
+oversubscribing the host. An upload that is already queued or running is
+not converted twice: submitting it again returns the existing job.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from lichess_insights import users
+
+MAX_RUNNING = int(os.environ.get("LICHESS_INSIGHTS_JOBS", min(2, os.cpu_count() or 1)))
+MAX_PENDING = int(os.environ.get("LICHESS_INSIGHTS_JOB_QUEUE", 8))
+# finished jobs are kept this long so every polling session sees the outcome
+KEEP_FINISHED_S = 3600
+
+
+class QueueFull(RuntimeError):
+    pass
+
+
+@dataclass
+class Job:
+    """Progress of one PGN conversion, updated in place by the worker thread."""
+
+    id: str
+    digest: str
+    requested_username: str | None
+    total: int  # estimated from the number of [Event tags in the upload
+    status: str = "queued"  # queued -> running -> done | failed
+    games: int = 0
+    username: str | None = None
+    error: str | None = None
+    submitted: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+
+    @property
+    def active(self):
+        return self.status in ("queued", "running")
+
+    @property
+    def fraction(self):
+        if self.status == "done":
+            return 1.0
+        return min(self.games / self.total, 1.0) if self.total else 0.0
+
+    @property
+    def eta(self):
+        """Seconds left at the rate so far, or None before the first batch lands."""
+        if self.status != "running" or not self.games:
+            return None
+        rate = self.games / max(time.time() - self.started, 1e-9)
+        return max(self.total - self.games, 0) / rate
+
+
+class JobQueue:
+    """Bounded pool of conversion workers plus the jobs they are working on."""
+
+    def __init__(self, max_running=MAX_RUNNING, max_pending=MAX_PENDING, ingest=users.ingest):
+        self._pool = ThreadPoolExecutor(max_running, thread_name_prefix="pgn-job")
+        self._slots = threading.BoundedSemaphore(max_running + max_pending)
+        self._ingest = ingest
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, pgn, username=None):
+        """Queue a PGN upload (bytes) for conversion and return its Job."""
+        digest = users.pgn_digest(pgn)
+        with self._lock:
+            self._forget_finished()
+            for job in self._jobs.values():
+                if job.active and job.digest == digest and job.requested_username == username:
+                    return job
+            if not self._slots.acquire(blocking=False):
+                raise QueueFull("The server is busy converting other uploads, try again shortly.")
+            job = Job(uuid.uuid4().hex[:12], digest, username, pgn.count(b"[Event "))
+            self._jobs[job.id] = job
+        self._pool.submit(self._run, job, pgn)
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self):
+        """Snapshot of every tracked job, oldest first."""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.submitted)
+
+    def _run(self, job, pgn):
+        job.status, job.started = "running", time.time()
+        try:
+            job.username, _ = self._ingest(
+                pgn,
+                job.requested_username,
+                progress=lambda n: setattr(job, "games", n),
+            )
+            job.status = "done"
+        except Exception as exc:  # surfaced to the polling session, not raised
+            job.error, job.status = str(exc) or type(exc).__name__, "failed"
+        finally:
+            job.finished = time.time()
+            self._slots.release()
+
+    def _forget_finished(self):
+        cutoff = time.time() - KEEP_FINISHED_S
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished < cutoff]:
+            del self._jobs[job_id]
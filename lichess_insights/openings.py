@@ -0,0 +1,103 @@
+"""Per-opening outcome statistics (Task 3)."""
+
+import numpy as np
+import pandas as pd
+
+from lichess_insights.outcomes import WINNERS, outcome_pivot
+
+
+def opening_stats(df_openings):
+    """One row per opening with win/draw counts and rates, most-played first."""
+    names = df_openings["opening_name"].unique()
+    table = outcome_pivot(df_openings, "opening_name", "outcome_count", order=names)
+    total = (
+        df_openings.groupby("opening_name", sort=False)["total_games"].first().reindex(names)
+    )
+    rates = table[WINNERS].div(total.where(total > 0), axis=0) * 100
+    return pd.DataFrame(
+        {
+            "opening": names,
+            "total_games": total.to_numpy(),
+            "white_wins": table["white"].to_numpy(),
+            "black_wins": table["black"].to_numpy(),
+            "draws": table["draw"].to_numpy(),
+            "white_wr": rates["white"].fillna(50).to_numpy(),
+            "black_wr": rates["black"].fillna(50).to_numpy(),
+            "draw_rate": rates["draw"].fillna(0).to_numpy(),
+        }
+    ).sort_values("total_games", ascending=False, kind="stable")
+
+
+def classify_opening_type(name):
+    """Classify an opening name into 1.e4, 1.d4, or Flank/Irregular."""
+    e4_keywords = [
+        "Sicilian",
+        "French",
+        "Caro-Kann",
+        "Scandinavian",
+        "Italian",
+        "Scotch",
+        "Philidor",
+        "Ruy Lopez",
+        "Petrov",
+        "Pirc",
+        "Alekhine",
+        "King's Gambit",
+        "Vienna",
+        "Bishop's Opening",
+    ]
+    d4_keywords = [
+        "Queen's Pawn",
+        "Queen's Gambit",
+        "Indian",
+        "Slav",
+        "Dutch",
+        "Benoni",
+        "Grunfeld",
+        "Nimzo",
+        "Bogo",
+        "Catalan",
+        "Trompowsky",
+        "London",
+        "Torre",
+        "Colle",
+    ]
+    for kw in e4_keywords:
+        if kw.lower() in name.lower():
+            return "1.e4"
+    for kw in d4_keywords:
+        if kw.lower() in name.lower():
+            return "1.d4"
+    return "Flank / Irregular"
+
+
+def filter_openings(df_ops, top_n, min_games=0, name_contains=""):
+    """
+    The top_n most-played openings with at least min_games games whose name
+    contains name_contains (case-insensitive). df_ops is already sorted by
+    popularity, so the game threshold is a prefix and top_n a head().
+    """
+    totals = df_ops["total_games"].to_numpy()
+    df = df_ops.iloc[: int(np.searchsorted(-totals, -min_games, side="right"))]
+    if name_contains:
+        df = df[df["opening"].str.contains(name_contains, case=False, regex=False)]
+    return df.head(top_n)
+
+
+def top_openings(df_ops, top_n, min_games=0, name_contains=""):
+    """The filtered top_n openings, ordered by White win rate, tagged with their type."""
+    df_top = filter_openings(df_ops, top_n, min_games, name_contains).sort_values(
+        "white_wr", ascending=True
+    )
+    df_top["opening_type"] = df_top["opening"].apply(classify_opening_type)
+    return df_top
+
+
+def opening_highlights(df_top):
+    """Best and worst opening for White, the most played and the most drawish, as rows."""
+    return {
+        "best": df_top.loc[df_top["white_wr"].idxmax()],
+        "worst": df_top.loc[df_top["white_wr"].idxmin()],
+        "most_popular": df_top.loc[df_top["total_games"].idxmax()],
+        "highest_draw": df_top.loc[df_top["draw_rate"].idxmax()],
+    }
@@ -0,0 +1,35 @@
+"""White/black/draw breakdown of any long (group, winner, count) table."""
+
+import numpy as np
+import pandas as pd
+
+WINNERS = ["white", "black", "draw"]
+
+
+def outcome_pivot(df, group, count, order=None):
+    """
+    One row per group with white/black/draw counts, their total and each as a
+    percentage of the total, from a single pivot of a long table. order fixes
+    the rows (groups missing from df become all-zero rows); percentages of
+    an empty group are NaN so callers can pick their own default.
+    """
+    wide = (
+        df.pivot_table(
+            index=group,
+            columns="winner",
+            values=count,
+            aggfunc="sum",
+            fill_value=0,
+            observed=True,
+        )
+        .reindex(columns=WINNERS, fill_value=0)
+        .astype(np.int64)
+    )
+    wide.columns = wide.columns.astype(str)
+    wide.columns.name = None
+    if order is not None:
+        wide = wide.reindex(pd.Index(order, name=group), fill_value=0)
+
+    wide["total"] = wide[WINNERS].sum(axis=1)
+    shares = wide[WINNERS].div(wide["total"].where(wide["total"] > 0), axis=0) * 100
+    return wide.join(shares.add_suffix("_pct"))
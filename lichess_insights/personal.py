@@ -0,0 +1,138 @@
+"""
+Per-game columns for the personal-data overlay.
+
+derive_personal turns a converted Chess.com export (pgn_to_csv.py schema)
+into one compact, typed frame from the player's point of view. It runs once
+per dataset; every chart's overlay only reads from it.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from lichess_insights.time_controls import (
+    CHESS_COM_BASE_UNIT,
+    category_shares,
+    parse_time_controls,
+)
+from lichess_insights.upsets import upset_rate_by_bin
+
+USERNAME = "shanew012"
+PERSONAL_GAMES = os.path.join("Personal data", f"{USERNAME}_games.csv")
+
+
+def guess_username(games):
+    """The player who appears in the most games of an export (its owner)."""
+    players = pd.concat([games["white_id"], games["black_id"]]).str.lower()
+    if players.empty:
+        raise ValueError("No games found in the PGN file.")
+    return players.value_counts().index[0]
+
+
+def derive_personal(games, username=USERNAME):
+    """
+    Colour, ratings, result, upset flags and time-control category for each
+    game the user played, computed column-wise with np.where.
+    """
+    games = games[
+        (games["white_id"].str.lower() == username.lower())
+        | (games["black_id"].str.lower() == username.lower())
+    ]
+    is_white = (games["white_id"].str.lower() == username.lower()).to_numpy()
+    white = games["white_rating"].to_numpy(dtype=np.int64)
+    black = games["black_rating"].to_numpy(dtype=np.int64)
+    winner = games["winner"].to_numpy(dtype=object)
+
+    my_color = np.where(is_white, "white", "black")
+    my_rating = np.where(is_white, white, black)
+    opp_rating = np.where(is_white, black, white)
+    decisive = winner != "draw"
+    result = np.where(~decisive, "draw", np.where(winner == my_color, "win", "loss"))
+    # same definition as task5_upsets: the lower-rated side won a decisive game
+    upset = ((white > black) & (winner == "black")) | ((black > white) & (winner == "white"))
+
+    tc = parse_time_controls(games["time_increment"], base_unit=CHESS_COM_BASE_UNIT)
+
+    return pd.DataFrame(
+        {
+            "game_id": games["game_id"].astype(str).to_numpy(),
+            "start_time": pd.to_datetime(games["start_time"].to_numpy(), unit="ms", utc=True),
+            "my_color": pd.Categorical(my_color, categories=["white", "black"]),
+            "my_rating": my_rating.astype(np.int16),
+            "opp_rating": opp_rating.astype(np.int16),
+            "rating_diff": (white - black).astype(np.int16),
+            "rating_gap": np.abs(white - black).astype(np.int16),
+            "turns": games["turns"].to_numpy(dtype=np.uint16),
+            "victory_status": pd.Categorical(games["victory_status"].to_numpy()),
+            "result": pd.Categorical(result, categories=["win", "loss", "draw"]),
+            "decisive": decisive,
+            "is_upset": upset,
+            "underdog": my_rating < opp_rating,
+            "tc_category": tc["category"].array,
+        }
+    ).sort_values("start_time", ignore_index=True)
+
+
+def filter_games(df_personal, statuses, turn_range, gap_range):
+    """The user's decisive games under the Task 1 filters (the database table has no draws)."""
+    return df_personal[
+        df_personal["decisive"]
+        & df_personal["victory_status"].isin(statuses)
+        & df_personal["turns"].between(*turn_range)
+        & df_personal["rating_gap"].between(*gap_range)
+    ]
+
+
+def result_by_colour(df_personal):
+    """Win/loss/draw percentages with each colour, indexed by my_color."""
+    return (
+        df_personal.groupby("my_color", observed=False)["result"]
+        .value_counts(normalize=True)
+        .unstack()
+        * 100
+    )
+
+
+def upset_bins(df_personal, gap_bin_size, max_gap_display, gap_bins, min_games=5):
+    """upset_rate_by_bin over the user's decisive games, for bins in gap_bins with >= min_games."""
+    bins = upset_rate_by_bin(df_personal[df_personal["decisive"]], gap_bin_size, max_gap_display)
+    return bins[(bins["total"] >= min_games) & bins["gap_bin"].isin(gap_bins)]
+
+
+def upset_split(df_personal):
+    """Upset % of the user's decisive games, and win % / games as underdog and as favourite."""
+    decisive = df_personal[df_personal["decisive"]]
+    underdog = decisive[decisive["underdog"]]
+    favourite = decisive[decisive["my_rating"] > decisive["opp_rating"]]
+    return {
+        "upset_pct": decisive["is_upset"].mean() * 100,
+        "underdog_win_pct": (underdog["result"] == "win").mean() * 100,
+        "underdog_games": len(underdog),
+        "favourite_win_pct": (favourite["result"] == "win").mean() * 100,
+        "favourite_games": len(favourite),
+    }
+
+
+def time_control_shares(df_personal):
+    """The user's games and % share of each victory_status per time-control category."""
+    return category_shares(
+        df_personal["tc_category"], df_personal["victory_status"], np.ones(len(df_personal), dtype=np.int64)
+    )
+
+
+def performance_summary(df_personal):
+    """Games played, win %, current (latest) and peak rating."""
+    return {
+        "games": len(df_personal),
+        "win_pct": (df_personal["result"] == "win").mean() * 100,
+        "current_rating": int(df_personal["my_rating"].iloc[-1]),
+        "peak_rating": int(df_personal["my_rating"].max()),
+    }
+
+
+def load_personal(path=PERSONAL_GAMES, username=USERNAME):
+    """Read the converted export and derive the overlay frame, or None if the file is missing."""
+    if not os.path.exists(path):
+        return None
+    return derive_personal(pd.read_csv(path), username)
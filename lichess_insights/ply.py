@@ -0,0 +1,98 @@
+"""
+Opening-ply distribution summaries per rating tier (Task 4).
+
+Everything a violin + box plot needs (quartiles, whiskers, mean and a
+kernel density on a fixed grid) is computed from per-ply counts, so the
+cost and the chart payload depend on the number of distinct ply values,
+not on the number of games.
+"""
+
+import numpy as np
+
+from lichess_insights.aggregate import TIER_LABELS
+from lichess_insights.tiers import short_tier, tier_edges, tier_labels
+
+
+def _quantile_from_counts(values, cum_counts, q):
+    """np.quantile(..., method='linear') for data given as sorted values and cumulative counts."""
+    pos = q * (cum_counts[-1] - 1)
+    lo, hi = int(np.floor(pos)), int(np.ceil(pos))
+    v_lo = values[np.searchsorted(cum_counts, lo, side="right")]
+    v_hi = values[np.searchsorted(cum_counts, hi, side="right")]
+    return float(v_lo + (v_hi - v_lo) * (pos - lo))
+
+
+def distribution_summary(values, counts, grid_points=64):
+    """Box-plot stats and a Gaussian KDE (Scott's rule) for values with the given counts."""
+    values = np.asarray(values, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.float64)
+    cum = np.cumsum(counts)
+    n = cum[-1]
+
+    q1, median, q3 = (_quantile_from_counts(values, cum, q) for q in (0.25, 0.5, 0.75))
+    iqr = q3 - q1
+    mean = float(values @ counts / n)
+    std = float(np.sqrt(((values - mean) ** 2) @ counts / n))
+
+    # box whiskers: furthest data points within 1.5 IQR of the box (as Plotly draws them)
+    lowerfence = float(values[values >= q1 - 1.5 * iqr].min())
+    upperfence = float(values[values <= q3 + 1.5 * iqr].max())
+
+    grid = np.linspace(values[0], values[-1], grid_points)
+    bandwidth = max(std * n ** (-1 / 5), 0.5)
+    z = (grid[:, None] - values[None, :]) / bandwidth
+    density = np.exp(-0.5 * z**2) @ counts / (n * bandwidth * np.sqrt(2 * np.pi))
+
+    return {
+        "n": int(n),
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "mean": mean,
+        "lowerfence": lowerfence,
+        "upperfence": upperfence,
+        "grid": grid,
+        "density": density,
+    }
+
+
+def ply_by_tier_summary(df_ply, tier_order=TIER_LABELS, grid_points=64):
+    """{tier: distribution_summary} for every tier that has at least one known opening ply."""
+    ply = df_ply.dropna(subset=["opening_ply"])
+    counts = ply.groupby(["rating_tier", "opening_ply"], observed=True).size()
+    summaries = {}
+    for tier in tier_order:
+        if tier not in counts.index.get_level_values(0):
+            continue
+        tier_counts = counts.loc[tier].sort_index()
+        summaries[tier] = distribution_summary(
+            tier_counts.index.to_numpy(), tier_counts.to_numpy(), grid_points
+        )
+    return summaries
+
+
+def ply_by_tier_from_ratings(rating_tiers, boundaries, grid_points=64):
+    """ply_by_tier_summary for any tier boundaries, one bincount per tier slice."""
+    summaries = {}
+    edges = tier_edges(rating_tiers, boundaries)
+    for tier, lo, hi in zip(tier_labels(boundaries), edges[:-1], edges[1:]):
+        plies = rating_tiers.opening_ply[lo:hi]
+        counts = np.bincount(plies[plies >= 0])
+        if not counts.any():
+            continue
+        values = np.flatnonzero(counts)
+        summaries[tier] = distribution_summary(values, counts[values], grid_points)
+    return summaries
+
+
+def violin_outline(summary, position, half_width=0.4):
+    """Closed (x, y) outline of a vertical violin at x = position from a summary's KDE."""
+    width = summary["density"] / summary["density"].max() * half_width
+    x = np.concatenate([position + width, (position - width)[::-1]])
+    y = np.concatenate([summary["grid"], summary["grid"][::-1]])
+    return x, y
+
+
+def median_by_tier(summaries):
+    """{short tier name: median opening ply}, in the summaries' tier order."""
+    return {short_tier(tier): s["median"] for tier, s in summaries.items()}
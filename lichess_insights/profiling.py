@@ -0,0 +1,131 @@
+"""
+Per-section timing of a dashboard rerun, and optional cProfile capture.
+
+The app calls SectionTimer.lap(section, phase) at each boundary of its
+script: the lap ends the phase that was running and starts the next, so the
+whole rerun is covered without wrapping sections in blocks. Phases are
+"data" (pandas / numpy prep), "figure" (building the Plotly figure),
+"serialize" (st.plotly_chart, which converts the figure to JSON and sends
+it) and "insight" (the insight boxes), plus "widgets" for the sidebar. A
+disabled timer does nothing.
+
+Enable it with ?profile=1 in the URL or LICHESS_INSIGHTS_PROFILE=1.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import marshal
+import os
+import pstats
+import time
+
+import pandas as pd
+
+PHASES = ["widgets", "data", "figure", "serialize", "insight"]
+ENV_FLAG = "LICHESS_INSIGHTS_PROFILE"
+
+logger = logging.getLogger(__name__)
+
+
+def enabled(query_params=None):
+    """True if ?profile=1 (or true/yes) is in the query params or the env flag is set."""
+    truthy = ("1", "true", "yes", "on")
+    if os.environ.get(ENV_FLAG, "").lower() in truthy:
+        return True
+    return str((query_params or {}).get("profile", "")).lower() in truthy
+
+
+def configure_logging(level=logging.INFO):
+    """Send the timing records to stderr, once per process, whatever the root logger does."""
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(level)
+
+
+class SectionTimer:
+    """Wall time per (section, phase) of one script run."""
+
+    def __init__(self, enabled=True, clock=time.perf_counter):
+        self.enabled = enabled
+        self._clock = clock
+        self._current = None  # (section, phase, start)
+        self.records = []  # (section, phase, seconds), in run order
+
+    def lap(self, section, phase):
+        """End the running phase (if any) and start timing section/phase."""
+        if not self.enabled:
+            return
+        now = self._clock()
+        self._close(now)
+        self._current = (section, phase, now)
+
+    def stop(self):
+        """End the running phase; call once at the end of the run."""
+        if self.enabled:
+            self._close(self._clock())
+            self._current = None
+
+    def _close(self, now):
+        if self._current is not None:
+            section, phase, start = self._current
+            self.records.append((section, phase, now - start))
+
+    def table(self):
+        """Milliseconds per section (rows, in run order) and phase (columns), with totals."""
+        df = pd.DataFrame(self.records, columns=["section", "phase", "seconds"])
+        sections = list(dict.fromkeys(df["section"]))
+        phases = PHASES + [p for p in dict.fromkeys(df["phase"]) if p not in PHASES]
+        ms = (
+            df.pivot_table(index="section", columns="phase", values="seconds", aggfunc="sum")
+            .reindex(index=sections, columns=phases)
+            .fillna(0)
+            * 1000
+        )
+        ms = ms.loc[:, ms.any(axis=0)]
+        ms["total"] = ms.sum(axis=1)
+        ms.loc["Total"] = ms.sum(axis=0)
+        ms.columns.name = None
+        return ms.round(1)
+
+    def log(self, **context):
+        """Emit the run's timings as one structured (JSON) log record."""
+        if not self.enabled:
+            return
+        record = {
+            "event": "rerun_timing",
+            **context,
+            "total_ms": round(sum(s for _, _, s in self.records) * 1000, 2),
+            "phases": [
+                {"section": section, "phase": phase, "ms": round(seconds * 1000, 2)}
+                for section, phase, seconds in self.records
+            ],
+        }
+        logger.info(json.dumps(record))
+
+
+# -- cProfile capture of a whole rerun --
+
+
+def start_profile():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def finish_profile(profiler, limit=30):
+    """
+    Stop a profiler and return (.prof file bytes, for snakeviz or pstats, and
+    a text report of the limit functions with the highest cumulative time).
+    """
+    profiler.disable()
+    profiler.create_stats()
+    # dump first: pstats.Stats takes the profiler's stats and leaves it empty
+    data = marshal.dumps(profiler.stats)
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(limit)
+    return data, report.getvalue()
@@ -0,0 +1,286 @@
+"""
+Compact, read-only store for the per-game task tables.
+
+task1_scatter and task5_upsets hold one row per game. Read straight from CSV
+every column is int64 or a Python string; GameStore narrows them to int16
+rating diffs/gaps, uint16 turns, a fixed-width bytes game_id and categorical
+(int8-coded) outcomes, and marks the numeric arrays read-only. One store is
+built per process and every session reads the same frames instead of getting
+its own copy.
+
+load_store also keeps the columns as .npy files in <data_dir>/.store/ and
+memory-maps them, so a restart or a forked worker maps the cache instead of
+re-parsing the CSVs, and processes share the pages through the OS page
+cache. manifest.json records each source file's size, mtime and SHA-256;
+the cache is rebuilt when a source changes.
+
+    python -m lichess_insights.store [data_dir]   # build the cache, print the footprint
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from lichess_insights.tables import read_file, read_table, table_path
+from lichess_insights.upsets import add_upset_flag
+
+
+CACHE_DIRNAME = ".store"
+# store table -> task file stem it is built from
+SOURCES = {"scatter": "task1_scatter", "upsets": "task5_upsets"}
+
+
+@dataclass(frozen=True)
+class GameStore:
+    """Shared per-game frames; treat them as read-only."""
+
+    scatter: pd.DataFrame  # game_id, rating_diff, turns, victory_status
+    upsets: pd.DataFrame  # rating_gap, outcome_type, is_upset
+
+
+def _narrow(values, dtype):
+    """Cast to a smaller integer dtype, refusing values that would wrap around."""
+    values = np.asarray(values)
+    info = np.iinfo(dtype)
+    if values.size and (values.min() < info.min or values.max() > info.max):
+        raise ValueError(f"values outside the {np.dtype(dtype).name} range")
+    return _frozen(values.astype(dtype))
+
+
+def _frozen(values):
+    values = np.ascontiguousarray(values)
+    values.flags.writeable = False
+    return values
+
+
+def build_store(df_scatter, df_upsets):
+    """Narrow the task1/task5 tables (as read by read_table) into a GameStore."""
+    scatter = pd.DataFrame(
+        {
+            "game_id": _frozen(df_scatter["game_id"].to_numpy(dtype="S")),
+            "rating_diff": _narrow(df_scatter["rating_diff"], np.int16),
+            "turns": _narrow(df_scatter["turns"], np.uint16),
+            "victory_status": pd.Categorical(df_scatter["victory_status"]),
+        },
+        copy=False,
+    )
+    upsets = add_upset_flag(
+        pd.DataFrame(
+            {
+                "rating_gap": _narrow(df_upsets["rating_gap"], np.int16),
+                "outcome_type": pd.Categorical(df_upsets["outcome_type"]),
+            },
+            copy=False,
+        )
+    )
+    return GameStore(scatter=scatter, upsets=upsets)
+
+
+# -- memory-mapped cache --
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _source_stats(path, with_hash=True):
+    st = os.stat(path)
+    stats = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if with_hash:
+        stats["sha256"] = _sha256(path)
+    return stats
+
+
+def _is_fresh(manifest, sources):
+    """
+    Same source files as the manifest, each unchanged: same size and either
+    the same mtime or (after a touch/checkout) the same content hash.
+    Returns (fresh, touched); touched means a hash matched under a new
+    mtime, which is then recorded in manifest so the next check skips the hash.
+    """
+    recorded = manifest.get("sources", {})
+    if sorted(recorded) != sorted(os.path.basename(p) for p in sources):
+        return False, False
+    touched = False
+    for path in sources:
+        old = recorded[os.path.basename(path)]
+        new = _source_stats(path, with_hash=False)
+        if new["size"] != old["size"]:
+            return False, False
+        if new["mtime_ns"] != old["mtime_ns"]:
+            if _sha256(path) != old["sha256"]:
+                return False, False
+            old["mtime_ns"] = new["mtime_ns"]
+            touched = True
+    return True, touched
+
+
+def _atomic_write(path, write):
+    """Write through a temporary file and rename it into place."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def write_cache(store, cache_dir, sources):
+    """
+    Save every store column as <table>.<column>.npy (categoricals as their
+    codes, with the categories in manifest.json) and return the manifest.
+    The manifest goes last, so a half-written cache is never taken as fresh.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, "manifest.json")
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    tables = {}
+    for table in SOURCES:
+        columns = {}
+        for column, values in getattr(store, table).items():
+            entry = {"file": f"{table}.{column}.npy"}
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                entry["categories"] = values.cat.categories.tolist()
+                array = values.cat.codes.to_numpy()
+            else:
+                array = values.to_numpy()
+            _atomic_write(
+                os.path.join(cache_dir, entry["file"]),
+                lambda f, array=array: np.save(f, array),
+            )
+            columns[column] = entry
+        tables[table] = columns
+
+    manifest = {
+        "sources": {os.path.basename(p): _source_stats(p) for p in sources},
+        "tables": tables,
+    }
+    _write_manifest(cache_dir, manifest)
+    return manifest
+
+
+def _write_manifest(cache_dir, manifest):
+    _atomic_write(
+        os.path.join(cache_dir, "manifest.json"),
+        lambda f: f.write(json.dumps(manifest, indent=2).encode()),
+    )
+
+
+def map_cache(cache_dir, manifest):
+    """GameStore whose columns are read-only memory maps of the cached .npy files."""
+    frames = {}
+    for table, columns in manifest["tables"].items():
+        data = {}
+        for column, entry in columns.items():
+            array = np.load(os.path.join(cache_dir, entry["file"]), mmap_mode="r")
+            if "categories" in entry:
+                # codes come from write_cache, so skip validation (a full pass
+                # over the map); the Categorical keeps the memmap as its codes
+                dtype = pd.CategoricalDtype(entry["categories"])
+                data[column] = pd.Categorical.from_codes(array, dtype=dtype, validate=False)
+            else:
+                data[column] = array
+        frames[table] = pd.DataFrame(data, copy=False)
+    return GameStore(**frames)
+
+
+def load_store(data_dir="."):
+    """
+    Memory-mapped GameStore for the task tables in data_dir, rebuilding the
+    .store/ cache from the source files first if it is missing or stale.
+    Returns (store, rebuilt).
+    """
+    sources = [table_path(stem, data_dir) for stem in SOURCES.values()]
+    cache_dir = os.path.join(data_dir, CACHE_DIRNAME)
+    try:
+        with open(os.path.join(cache_dir, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        fresh, touched = _is_fresh(manifest, sources)
+        if fresh:
+            if touched:
+                try:
+                    _write_manifest(cache_dir, manifest)
+                except OSError:
+                    pass  # read-only cache: hash again next time
+            return map_cache(cache_dir, manifest), False
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+
+    store = build_store(*(read_file(p) for p in sources))
+    try:
+        manifest = write_cache(store, cache_dir, sources)
+    except OSError:
+        return store, True  # read-only data directory: serve the in-memory store
+    return map_cache(cache_dir, manifest), True
+
+
+def is_mapped(column):
+    """True if a column's data (a categorical's codes) is a view of a memory-mapped file."""
+    values = column.array
+    array = values.codes if isinstance(values, pd.Categorical) else column.to_numpy()
+    while isinstance(array, np.ndarray) and not isinstance(array, np.memmap):
+        array = array.base
+    return isinstance(array, np.memmap)
+
+
+def footprint(store):
+    """
+    Bytes per column of every frame in the store (deep, i.e. including string
+    data) and whether the column is memory-mapped from the cache.
+    """
+    rows = []
+    for table in ("scatter", "upsets"):
+        df = getattr(store, table)
+        usage = df.memory_usage(index=False, deep=True)
+        for column in df.columns:
+            rows.append(
+                {
+                    "table": table,
+                    "column": column,
+                    "dtype": str(df[column].dtype),
+                    "bytes": int(usage[column]),
+                    "mapped": is_mapped(df[column]),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def process_rss():
+    """Resident set size of this process in bytes (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    data_dir = argv[0] if argv else "."
+    store, rebuilt = load_store(data_dir)
+    before = sum(
+        int(read_table(stem, data_dir).memory_usage(index=False, deep=True).sum())
+        for stem in SOURCES.values()
+    )
+    report = footprint(store)
+    print(report.to_string(index=False))
+    print(f"\nstore: {report['bytes'].sum():,} bytes (source frames: {before:,} bytes)")
+    cache_dir = os.path.join(data_dir, CACHE_DIRNAME)
+    print(f"cache: {cache_dir} ({'rebuilt' if rebuilt else 'up to date'})")
+
+
+if __name__ == "__main__":
+    main()
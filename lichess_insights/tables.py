@@ -0,0 +1,41 @@
+"""
+Locating and reading the dashboard's data files.
+
+Each table is stored as <stem>.csv and optionally as a typed .parquet or
+.feather copy (see aggregate.write_all); the columnar copy is read in
+preference to the CSV when both exist.
+"""
+
+import os
+
+import pandas as pd
+
+EXTENSIONS = (".parquet", ".feather", ".csv")
+
+
+def table_path(stem, data_dir="."):
+    """The file read_table picks for a table: .parquet, then .feather, then .csv."""
+    for ext in EXTENSIONS:
+        path = os.path.join(data_dir, stem + ext)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(os.path.join(data_dir, f"{stem}.csv"))
+
+
+def has_table(stem, data_dir="."):
+    return any(os.path.exists(os.path.join(data_dir, stem + ext)) for ext in EXTENSIONS)
+
+
+def read_file(path):
+    """Read one .csv, .parquet or .feather/.arrow file into a DataFrame."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        return pd.read_parquet(path)
+    if ext in (".feather", ".arrow"):
+        return pd.read_feather(path)
+    return pd.read_csv(path)
+
+
+def read_table(stem, data_dir="."):
+    """Read a data table, preferring a typed .parquet/.feather copy over the .csv."""
+    return read_file(table_path(stem, data_dir))
@@ -0,0 +1,140 @@
+"""
+White/black/draw breakdown per rating tier (Task 2).
+
+The shipped task2/task4 tables use the four tiers fixed in data_aggr.sql.
+RatingTiers keeps every game's average rating sorted (from the game_ratings
+table written by aggregate.py), so any boundary list can be applied at
+runtime: np.searchsorted finds where each tier starts, and running outcome
+counts give every tier's W/B/D totals without touching the games again.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from lichess_insights.aggregate import TIER_LABELS
+from lichess_insights.outcomes import WINNERS, outcome_pivot
+
+DEFAULT_BOUNDARIES = (1200, 1500, 1800)
+
+
+def short_tier(tier):
+    """"2. Intermediate (1200-1499)" -> "Intermediate (1200-1499)"."""
+    return tier.split(". ", 1)[1] if ". " in tier else tier
+
+
+def tier_table(df_tiers, tier_order=TIER_LABELS):
+    """W/B/D counts and percentages per tier in tier_order, from one pivot of task2."""
+    return outcome_pivot(df_tiers, "rating_tier", "game_count", tier_order)
+
+
+def tier_rows(table):
+    """Per-tier percentages and counts (denominator = ALL games including draws)."""
+    return pd.DataFrame(
+        {
+            "tier": [short_tier(t) for t in table.index],
+            "White Win %": table["white_pct"].fillna(0).to_numpy(),
+            "Draw %": table["draw_pct"].fillna(0).to_numpy(),
+            "Black Win %": table["black_pct"].fillna(0).to_numpy(),
+            "wc": table["white"].to_numpy(),
+            "bc": table["black"].to_numpy(),
+            "dc": table["draw"].to_numpy(),
+            "total": table["total"].to_numpy(),
+        }
+    ).to_dict("records")
+
+
+def tier_advantages(table):
+    """(tier, white %, black %, draw %) per tier, with a consistent W+B+D denominator."""
+    return list(
+        zip(
+            [short_tier(t) for t in table.index],
+            table["white_pct"].fillna(50).tolist(),
+            table["black_pct"].fillna(50).tolist(),
+            table["draw_pct"].fillna(0).tolist(),
+        )
+    )
+
+
+def advantage_highlights(advantages):
+    """Tiers (as tier_advantages tuples) with the highest/lowest White % and the highest draw %."""
+    return {
+        "max_white": max(advantages, key=lambda a: a[1]),
+        "min_white": min(advantages, key=lambda a: a[1]),
+        "max_draw": max(advantages, key=lambda a: a[3]),
+    }
+
+
+# -- runtime tiering on raw average ratings --
+
+
+@dataclass(frozen=True)
+class RatingTiers:
+    """Per-game columns ordered by average rating."""
+
+    avg_rating: np.ndarray  # sorted ascending
+    winner_cum: np.ndarray  # (n + 1, 3) running white/black/draw counts along avg_rating
+    opening_ply: np.ndarray  # int16, -1 where unknown
+
+
+def build_rating_tiers(avg_rating, winner, opening_ply):
+    """Sort the games by average rating once; every re-tiering reads from this."""
+    avg_rating = np.asarray(avg_rating, dtype=np.float64)
+    order = np.argsort(avg_rating, kind="stable")
+    codes = pd.Categorical(np.asarray(winner)[order], categories=WINNERS).codes
+    onehot = codes[:, None] == np.arange(len(WINNERS))
+    winner_cum = np.zeros((len(order) + 1, len(WINNERS)), dtype=np.int64)
+    np.cumsum(onehot, axis=0, out=winner_cum[1:])
+    ply = pd.to_numeric(pd.Series(opening_ply), errors="coerce").to_numpy(dtype=np.float64)
+    return RatingTiers(
+        avg_rating=avg_rating[order],
+        winner_cum=winner_cum,
+        opening_ply=np.nan_to_num(ply[order], nan=-1).astype(np.int16),
+    )
+
+
+def parse_boundaries(text):
+    """ "1200, 1500, 1800" -> (1200, 1500, 1800); must be strictly increasing integers."""
+    try:
+        boundaries = tuple(int(b) for b in text.replace(",", " ").split())
+    except ValueError:
+        raise ValueError("Tier boundaries must be whole ratings, e.g. 1200, 1500, 1800.") from None
+    if not boundaries or any(lo >= hi for lo, hi in zip(boundaries, boundaries[1:])):
+        raise ValueError("Tier boundaries must be one or more increasing ratings.")
+    return boundaries
+
+
+def tier_labels(boundaries):
+    """Ordered tier labels; the default boundaries keep the data_aggr.sql names."""
+    if tuple(boundaries) == DEFAULT_BOUNDARIES:
+        return list(TIER_LABELS)
+    bands = [f"<{boundaries[0]}"]
+    bands += [f"{lo}-{hi - 1}" for lo, hi in zip(boundaries, boundaries[1:])]
+    bands.append(f"{boundaries[-1]}+")
+    return [f"{i}. {band}" for i, band in enumerate(bands, 1)]
+
+
+def tier_edges(rating_tiers, boundaries):
+    """
+    Start/end positions of each tier in the sorted ratings: tier i holds the
+    games with boundaries[i-1] <= average < boundaries[i]. (The SQL CASE
+    differs only for x.5 averages just below a boundary, e.g. 1499.5, which it
+    drops into the top tier.)
+    """
+    inner = np.searchsorted(rating_tiers.avg_rating, boundaries, side="left")
+    return np.concatenate([[0], inner, [len(rating_tiers.avg_rating)]])
+
+
+def tier_counts(rating_tiers, boundaries):
+    """Long (rating_tier, winner, game_count) table like task2_tiers, for any boundaries."""
+    edges = tier_edges(rating_tiers, boundaries)
+    counts = rating_tiers.winner_cum[edges[1:]] - rating_tiers.winner_cum[edges[:-1]]
+    labels = tier_labels(boundaries)
+    return pd.DataFrame(
+        {
+            "rating_tier": np.repeat(labels, len(WINNERS)),
+            "winner": np.tile(WINNERS, len(labels)),
+            "game_count": counts.ravel(),
+        }
+    )
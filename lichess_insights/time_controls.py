@@ -0,0 +1,107 @@
+"""
+Time-control parsing, categories and outcome shares (Task 6).
+
+Time controls are 'base+increment' strings. Lichess gives the base in minutes
+("15+2"), Chess.com and PGN TimeControl tags in seconds ("180+2", "300");
+both are normalised to base and increment seconds. Columns are parsed
+through a cached lookup per distinct string, so bucketing millions of rows
+costs one parse per distinct time control, not one per row.
+"""
+
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+
+CATEGORIES = ["Bullet", "Blitz", "Rapid", "Classical"]
+STATUS_ORDER = ["mate", "resign", "outoftime", "draw"]
+LICHESS_BASE_UNIT = 60  # Lichess exports: base time in minutes
+CHESS_COM_BASE_UNIT = 1  # Chess.com / PGN TimeControl: base time in seconds
+TIME_CONTROL_RE = re.compile(r"\s*(\d+)\s*(?:\+\s*(\d+))?\s*")
+
+
+def speed_category(seconds):
+    """Bucket an estimated duration the way Lichess does (ultrabullet counts as bullet)."""
+    if seconds < 180:
+        return "Bullet"
+    if seconds < 480:
+        return "Blitz"
+    if seconds < 1500:
+        return "Rapid"
+    return "Classical"
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_time_control(time_increment, base_unit=LICHESS_BASE_UNIT):
+    """
+    'base+increment' -> (base seconds, increment seconds, estimated duration
+    in seconds as base + 40 x increment, speed category), or None if the
+    string is not a time control.
+    """
+    match = TIME_CONTROL_RE.fullmatch(time_increment)
+    if match is None:
+        return None
+    base = int(match[1]) * base_unit
+    inc = int(match[2] or 0)
+    estimated = base + 40 * inc
+    return base, inc, estimated, speed_category(estimated)
+
+
+def parse_time_controls(time_increment, base_unit=LICHESS_BASE_UNIT):
+    """
+    Vectorised parse of a column of time controls: base_seconds,
+    increment_seconds, estimated_seconds (nullable ints) and category, aligned
+    with the input. Unparseable or missing values get <NA>.
+    """
+    codes, uniques = pd.factorize(pd.Series(time_increment).astype("string"))
+    parsed = [parse_time_control(u, base_unit) for u in uniques]
+    # one extra slot at the end for code -1 (missing) and unparseable strings
+    lookup = np.full((len(uniques) + 1, 3), np.nan)
+    category = np.full(len(uniques) + 1, -1, dtype=np.int8)
+    for i, p in enumerate(parsed):
+        if p is not None:
+            lookup[i] = p[:3]
+            category[i] = CATEGORIES.index(p[3])
+    rows = lookup[codes]
+    return pd.DataFrame(
+        {
+            "base_seconds": pd.array(rows[:, 0], dtype="Int64"),
+            "increment_seconds": pd.array(rows[:, 1], dtype="Int64"),
+            "estimated_seconds": pd.array(rows[:, 2], dtype="Int64"),
+            "category": pd.Categorical.from_codes(category[codes], CATEGORIES),
+        }
+    )
+
+
+def outcome_shares(df_time, base_unit=LICHESS_BASE_UNIT):
+    """Games and % share of each victory_status within each time-control category."""
+    category = parse_time_controls(df_time["time_increment"], base_unit)["category"]
+    return category_shares(category, df_time["victory_status"], df_time["game_count"])
+
+
+def category_shares(category, victory_status, game_count):
+    """outcome_shares for columns already bucketed into CATEGORIES."""
+    counts = (
+        pd.DataFrame(
+            {
+                "category": np.asarray(category),
+                "victory_status": np.asarray(victory_status),
+                "game_count": np.asarray(game_count),
+            }
+        )
+        .groupby(["category", "victory_status"], observed=True)["game_count"]
+        .sum()
+        .unstack(fill_value=0)
+        .reindex(index=CATEGORIES, columns=STATUS_ORDER, fill_value=0)
+    )
+    counts = counts[counts.sum(axis=1) > 0]
+    shares = counts.div(counts.sum(axis=1), axis=0) * 100
+    return counts, shares
+
+
+def outcome_highlights(shares):
+    """Categories with the highest timeout and draw shares, or None if there are no games."""
+    if shares.empty:
+        return None
+    return {"most_timeouts": shares["outoftime"].idxmax(), "most_draws": shares["draw"].idxmax()}
@@ -0,0 +1,54 @@
+"""Upset rate by rating gap (Task 5 in the dashboard, task5_upsets.csv)."""
+
+import numpy as np
+import pandas as pd
+
+UPSET = "Upset (Lower Rated Won)"
+EXPECTED = "Expected (Higher Rated Won)"
+
+
+def add_upset_flag(df_upsets):
+    """Add a boolean is_upset column so later passes never compare outcome strings."""
+    df_upsets["is_upset"] = (df_upsets["outcome_type"] == UPSET).to_numpy()
+    return df_upsets
+
+
+def upset_rate_by_bin(df_upsets, gap_bin_size, max_gap_display):
+    """
+    Games, upsets and upset rate (%) per rating-gap bin up to max_gap_display.
+    One bincount pass each for the totals and the upsets; needs add_upset_flag.
+    """
+    gap = df_upsets["rating_gap"].to_numpy(dtype=np.int64)
+    keep = gap <= max_gap_display
+    bins = gap[keep] // gap_bin_size
+
+    total = np.bincount(bins)
+    weights = df_upsets["is_upset"].to_numpy()[keep]
+    n_upsets = np.bincount(bins, weights=weights, minlength=len(total))
+    occupied = np.flatnonzero(total)
+    return pd.DataFrame(
+        {
+            "gap_bin": occupied * gap_bin_size,
+            "total": total[occupied],
+            "upsets": n_upsets[occupied].astype(np.int64),
+            "upset_rate": n_upsets[occupied] / total[occupied] * 100,
+        }
+    )
+
+
+def bin_labels(gap_bins, gap_bin_size):
+    """Human-readable range label per bin, e.g. "0–49", "50–99"."""
+    return [f"{int(b)}–{int(b + gap_bin_size - 1)}" for b in gap_bins]
+
+
+def upset_summary(df_upsets):
+    """Overall, close-game (gap <= 50) and big-gap (>= 400) upset percentages."""
+    is_upset = df_upsets["is_upset"].to_numpy()
+    gap = df_upsets["rating_gap"].to_numpy()
+    close = gap <= 50
+    big_gap = gap >= 400
+    return {
+        "overall": is_upset.mean() * 100,
+        "close": is_upset[close].mean() * 100 if close.any() else 0,
+        "big_gap": is_upset[big_gap].mean() * 100 if big_gap.any() else 0,
+    }
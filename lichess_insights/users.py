@@ -0,0 +1,236 @@
+"""
+Per-user overlay artifacts in a content-addressed on-disk cache.
+
+A PGN export is converted (Personal data/pgn_to_csv.py) and turned into the
+overlay frame (personal.derive_personal) at most once per archive: artifacts
+live under the SHA-256 of the PGN bytes, so the same upload from another
+session, or after a restart, is a cache hit. registry.json maps each
+username to the digest of their latest archive. The whole cache is capped at
+MAX_CACHE_BYTES, evicting the least recently used archives first.
+
+Layout:
+    <CACHE_DIR>/registry.json
+    <CACHE_DIR>/<digest>/games.csv         converted games (pgn_to_csv schema)
+    <CACHE_DIR>/<digest>/<username>.parquet  derived overlay frame
+"""
+
+import functools
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+import pandas as pd
+
+from lichess_insights.personal import derive_personal, guess_username
+
+CACHE_DIR = os.environ.get("LICHESS_INSIGHTS_CACHE", os.path.join(".cache", "users"))
+MAX_CACHE_BYTES = int(os.environ.get("LICHESS_INSIGHTS_CACHE_BYTES", 512 * 1024 * 1024))
+CONVERTER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Personal data", "pgn_to_csv.py"
+)
+USERNAME_RE = re.compile(r"[A-Za-z0-9_-]{1,50}")
+
+# one lock per archive, so concurrent sessions uploading the same PGN wait
+# for a single conversion instead of each running their own
+_locks = {}
+_locks_guard = threading.Lock()
+_registry_lock = threading.Lock()
+
+
+def _archive_lock(digest):
+    with _locks_guard:
+        return _locks.setdefault(digest, threading.Lock())
+
+
+def _converter():
+    """Import Personal data/pgn_to_csv.py (a standalone script, not a package module)."""
+    spec = importlib.util.spec_from_file_location("pgn_to_csv", CONVERTER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def pgn_digest(pgn):
+    """SHA-256 of a PGN given as bytes or a path (read in 1 MiB blocks)."""
+    if isinstance(pgn, (bytes, bytearray)):
+        return hashlib.sha256(pgn).hexdigest()
+    h = hashlib.sha256()
+    with open(pgn, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def normalise_username(username):
+    """Lower-cased username, rejecting anything that isn't safe as a file name."""
+    if not USERNAME_RE.fullmatch(username or ""):
+        raise ValueError(f"Invalid username: {username!r}")
+    return username.lower()
+
+
+# -- registry --
+
+
+def _registry_path(cache_dir):
+    return os.path.join(cache_dir, "registry.json")
+
+
+def read_registry(cache_dir=CACHE_DIR):
+    """{username: digest} for every registered user (empty if there is no cache yet)."""
+    try:
+        with open(_registry_path(cache_dir), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_json(path, data):
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _update_registry(cache_dir, update):
+    with _registry_lock:
+        registry = read_registry(cache_dir)
+        update(registry)
+        _write_json(_registry_path(cache_dir), registry)
+        return registry
+
+
+# -- artifacts --
+
+
+def _touch(path):
+    """Mark an archive as recently used (its directory mtime drives LRU eviction)."""
+    os.utime(path, (time.time(),) * 2)
+
+
+def _convert(pgn, entry, converter):
+    """Convert a PGN (bytes or path) into <entry>/games.csv, atomically."""
+    source = io.BytesIO(pgn) if isinstance(pgn, (bytes, bytearray)) else pgn
+    tmp = os.path.join(entry, f"games.{threading.get_ident()}.tmp.csv")
+    converter(source, tmp)
+    os.replace(tmp, os.path.join(entry, "games.csv"))
+
+
+def ingest(
+    pgn,
+    username=None,
+    cache_dir=CACHE_DIR,
+    max_bytes=MAX_CACHE_BYTES,
+    convert=None,
+    progress=None,
+):
+    """
+    Convert a PGN archive and derive its overlay frame, reusing cached
+    artifacts when this archive (and username) has been seen before.
+    username defaults to the player appearing in the most games.
+    convert(pgn_source, csv_path) defaults to pgn_to_csv.pgn_to_csv, which
+    reports games converted so far to progress(n_games).
+
+    Returns (username, digest); the user is (re)registered to this archive.
+    Raises ValueError for an invalid username or a PGN without games (whose
+    cache entry is dropped again).
+    """
+    if username is not None:
+        username = normalise_username(username)  # reject a bad name before converting
+    digest = pgn_digest(pgn)
+    entry = os.path.join(cache_dir, digest)
+    games_csv = os.path.join(entry, "games.csv")
+
+    with _archive_lock(digest):
+        os.makedirs(entry, exist_ok=True)
+        games = None
+        if not os.path.exists(games_csv):
+            convert = convert or functools.partial(
+                _converter().pgn_to_csv, progress=progress, quiet=True
+            )
+            _convert(pgn, entry, convert)
+            games = pd.read_csv(games_csv)
+            if games.empty:
+                shutil.rmtree(entry, ignore_errors=True)
+                raise ValueError("No games found in this PGN file.")
+
+        if username is None:
+            games = pd.read_csv(games_csv) if games is None else games
+            username = normalise_username(guess_username(games))
+        overlay = os.path.join(entry, f"{username}.parquet")
+        if not os.path.exists(overlay):
+            games = pd.read_csv(games_csv) if games is None else games
+            frame = derive_personal(games, username)
+            if frame.empty:
+                raise ValueError(f"{username} did not play any game in this PGN file.")
+            tmp = f"{overlay}.{threading.get_ident()}.tmp"
+            frame.to_parquet(tmp)
+            os.replace(tmp, overlay)
+        _touch(entry)
+
+    _update_registry(cache_dir, lambda registry: registry.update({username: digest}))
+    evict(cache_dir, max_bytes, keep=digest)
+    return username, digest
+
+
+def load(username, cache_dir=CACHE_DIR):
+    """The cached overlay frame for a registered user, or None if unknown or evicted."""
+    username = normalise_username(username)
+    digest = read_registry(cache_dir).get(username)
+    if digest is None:
+        return None
+    entry = os.path.join(cache_dir, digest)
+    try:
+        frame = pd.read_parquet(os.path.join(entry, f"{username}.parquet"))
+    except FileNotFoundError:
+        return None
+    _touch(entry)
+    return frame
+
+
+def _dir_size(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, keep=None):
+    """
+    Delete least recently used archives until the cache fits in max_bytes
+    (never the `keep` digest) and drop registry entries that pointed at them.
+    Returns the evicted digests.
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if os.path.isdir(path):
+            entries.append((os.path.getmtime(path), name, _dir_size(path)))
+    total = sum(size for _, _, size in entries)
+
+    evicted = []
+    for _, name, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name == keep:
+            continue
+        with _archive_lock(name):
+            shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+        total -= size
+        evicted.append(name)
+
+    if evicted:
+
+        def forget(registry):
+            for user, digest in list(registry.items()):
+                if digest in evicted:
+                    del registry[user]
+
+        _update_registry(cache_dir, forget)
+    return evicted